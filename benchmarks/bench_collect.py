@@ -0,0 +1,35 @@
+"""Measure concurrent profile collection of NetshWlan with a fake netsh.
+
+Every fake command sleeps for a fixed latency, like spawning netsh does on Windows,
+so the speedup of the worker pool can be measured on any platform.
+
+    python benchmarks/bench_collect.py --profiles 200 --latency 0.02 --workers 1 4 8 16
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from collector import NetshWlan
+from synthetic import SyntheticRunner
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per fake netsh call")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    args = parser.parse_args()
+
+    runner = SyntheticRunner(profiles=args.profiles, latency=args.latency)
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        wlan = NetshWlan(workers=workers, runner=runner)
+        elapsed = time.perf_counter() - start
+        assert len(wlan.listInfo) == args.profiles and not wlan.failures
+        baseline = baseline or elapsed
+        print("workers=%-3d %8.3fs  speedup x%.1f" % (workers, elapsed, baseline / elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Compare the single-pass netsh parser with the former line-removing parser.
+
+    python benchmarks/bench_parse.py --profiles 1000 5000 20000
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from parsers import parseProfiles, parseProfileInfo
+from synthetic import wlanListing, wlanProfile
+
+def legacyListName(output):
+    """Former NetshWlan.__getListName"""
+    chunkLine = output.split('\n')
+    i = 0
+    while i < len(chunkLine):
+        if chunkLine[i].find('All User Profile') == -1:
+            chunkLine.remove(chunkLine[i])
+            i -= 1
+        else:
+            chunkLine[i] = chunkLine[i].replace('    All User Profile     : ', '')
+        i += 1
+    return chunkLine
+
+def legacyNetworkInfo(ssid, output):
+    """Former NetshWlan.__getNetworkInfo"""
+    chunkInfo = output.split('\n')
+    i = 0
+    while i < len(chunkInfo):
+        if chunkInfo[i].find("Authentication") == -1 and chunkInfo[i].find("Key") == -1:
+            chunkInfo.remove(chunkInfo[i])
+            i -= 1
+        i += 1
+    chunkInfo[0] = chunkInfo[0].replace("    Authentication         : ", "")
+    if chunkInfo[1].find("Authentication") != -1:
+        chunkInfo.remove(chunkInfo[1])
+        chunkInfo[1] = chunkInfo[1].replace("    Key Content            : ", "")
+    else:
+        chunkInfo[1] = "None"
+    return [ssid, chunkInfo[0], chunkInfo[1]]
+
+def best(function, repeat):
+    """Best wall time of function over repeat runs"""
+    result = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        result = min(result, time.perf_counter() - start)
+    return result
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--noise", type=int, default=2000, help="unrelated lines in one profile output")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for count in args.profiles:
+        listing = wlanListing(count)
+        old = best(lambda: legacyListName(listing), args.repeat)
+        new = best(lambda: list(parseProfiles(listing.splitlines())), args.repeat)
+        print("listing  %6d profiles  legacy %8.4fs  single-pass %8.4fs  x%.1f" % (count, old, new, old / new))
+
+    info = wlanProfile(0, args.noise)   # profile 0 stores a key, as the legacy parser expects
+    old = best(lambda: legacyNetworkInfo("Network 0", info), args.repeat)
+    new = best(lambda: parseProfileInfo(info.splitlines()), args.repeat)
+    print("profile  %6d lines     legacy %8.4fs  single-pass %8.4fs  x%.1f" % (args.noise, old, new, old / new))
+
+if __name__ == "__main__":
+    main()
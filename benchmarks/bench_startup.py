@@ -0,0 +1,46 @@
+"""Compare startup of the GUI import path with the headless CLI path.
+
+Each path is imported in a fresh interpreter, wall time and peak memory are reported.
+
+    python benchmarks/bench_startup.py --repeat 10
+"""
+import os
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "fixtures", "sample")
+PATHS = {
+    "gui": "import main",       # Tk, ttk, Table and all collectors
+    "headless": "import cli",   # collectors only
+    "cli-run": "import cli, io; cli.main(['--replay', %r, 'wlan'], out=io.StringIO())" % FIXTURES,   # a whole collection
+}
+PROBE = "import resource, sys; sys.path.insert(0, %r); t = __import__('time').perf_counter(); %s; " + \
+        "print(__import__('time').perf_counter() - t, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)"
+
+def measure(statement, repeat):
+    """(best process wall time, best import time, peak memory in KiB) of a statement in fresh interpreters"""
+    best = (float("inf"), float("inf"), 0)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", PROBE % (SRC, statement)], check=True,
+                                capture_output=True, text=True).stdout.split()
+        wall = time.perf_counter() - start
+        best = min(best, (wall, float(output[0]), int(output[1])))
+    return best
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    baseline = measure("pass", args.repeat)
+    print("%-9s process %7.1fms  import %7.1fms  peak %6d KiB" % ("python", baseline[0] * 1000, 0, baseline[2]))
+    for name, statement in PATHS.items():
+        wall, imported, peak = measure(statement, args.repeat)
+        print("%-9s process %7.1fms  import %7.1fms  peak %6d KiB" % (name, wall * 1000, imported * 1000, peak))
+
+if __name__ == "__main__":
+    main()
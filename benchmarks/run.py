@@ -0,0 +1,305 @@
+"""Benchmark suite of parsers, collectors, Table population, key toggling, QR rendering, exports and search.
+
+All inputs are synthetic (see synthetic.py), nothing touches the network or Windows. Results are JSON,
+so runs of two commits can be compared:
+
+    python benchmarks/run.py --output before.json
+    python benchmarks/run.py --output after.json --compare before.json
+
+Tk cases need a display, Xvfb is started when there is none and it is installed, otherwise they are
+skipped. QR cases are skipped without pyqrcode. Skipped cases are listed in the results."""
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from synthetic import SyntheticRunner, wlanListing, wlanProfile, ipconfigAll, wlanRecords
+from parsers import parseProfiles, parseProfileInfo, parseIpConfig
+from collector import NetshWlan, IpConfig
+from export import exportRecords, profileRecords, nicRecords, PROFILE_FIELDS, NIC_FIELDS
+from qrcache import QrCache, wifiPayload
+from search import ProfileIndex
+
+PROFILE_SIZES = [10, 1000, 10000]   # up to 100000 works, it takes a few minutes
+ADAPTER_SIZES = [1, 50, 500]
+DISTINCT_OUTPUTS = 1000     # profile outputs which are generated, bigger sizes reuse them
+TK_MAX = 20000      # rows of a plain treeview, it gets very slow beyond
+QR_MAX = 200        # codes rendered per size, rendering is slow in pure Python
+CASES = []          # (name, group, factory), factory(size, context) returns run() -> seconds
+
+def case(name, group):
+    """Register a benchmark, group tells which sizes it takes and what it needs"""
+    def register(factory):
+        CASES.append((name, group, factory))
+        return factory
+    return register
+
+def timed(function, *args):
+    """Seconds of one call"""
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+@case("parse.listing", "profiles")
+def benchListing(size, context):
+    lines = wlanListing(size).splitlines()
+    return lambda: timed(lambda: list(parseProfiles(lines)))
+
+@case("parse.profileInfo", "profiles")
+def benchProfileInfo(size, context):
+    outputs = [wlanProfile(i).splitlines() for i in range(min(size, DISTINCT_OUTPUTS))]
+    return lambda: timed(lambda: [parseProfileInfo(outputs[i % len(outputs)]) for i in range(size)])
+
+@case("collect.wlan", "profiles")
+def benchCollectWlan(size, context):
+    """Whole NetshWlan in one worker, output generation of SyntheticRunner is included"""
+    return lambda: timed(lambda: NetshWlan(workers=1, runner=SyntheticRunner(profiles=size)))
+
+@case("export.csv", "profiles")
+def benchExportCsv(size, context):
+    records = wlanRecords(size)
+    path = os.path.join(context["directory"], "profiles.csv")
+    return lambda: timed(exportRecords, profileRecords(records), path, PROFILE_FIELDS)
+
+@case("export.csv.gz", "profiles")
+def benchExportCsvGz(size, context):
+    records = wlanRecords(size)
+    path = os.path.join(context["directory"], "profiles.csv.gz")
+    return lambda: timed(exportRecords, profileRecords(records), path, PROFILE_FIELDS)
+
+@case("search.index", "profiles")
+def benchSearchIndex(size, context):
+    records = wlanRecords(size)
+    return lambda: timed(ProfileIndex, records)
+
+@case("search.filter", "profiles")
+def benchSearchFilter(size, context):
+    """Queries of a filter box typed keystroke by keystroke, over a built index"""
+    index = ProfileIndex(wlanRecords(size))
+    queries = ["g", "gu", "gue", "gues", "guest; net, 1", "n", "ne", "net", "network 12", "^network 9"]
+    return lambda: timed(lambda: [index.search(query, kind) for query in queries for kind in (None, "Open")])
+
+@case("parse.ipconfig", "adapters")
+def benchIpConfig(size, context):
+    lines = ipconfigAll(size).splitlines()
+    return lambda: timed(lambda: list(parseIpConfig(lines)))
+
+@case("collect.nics", "adapters")
+def benchCollectNics(size, context):
+    runner = SyntheticRunner(adapters=size)
+    return lambda: timed(lambda: IpConfig(runner=runner))
+
+@case("export.nics.csv", "adapters")
+def benchExportNics(size, context):
+    nics = IpConfig(runner=SyntheticRunner(adapters=size)).nics
+    path = os.path.join(context["directory"], "nics.csv")
+    return lambda: timed(exportRecords, nicRecords(nics), path, NIC_FIELDS)
+
+@case("table.fill", "tk")
+def benchTableFill(size, context):
+    return tableRun(context, size, virtual=False, action="fill")
+
+@case("table.fill.virtual", "profiles-tk")
+def benchTableFillVirtual(size, context):
+    return tableRun(context, size, virtual=True, action="fill")
+
+@case("table.set", "tk")
+def benchTableSet(size, context):
+    return tableRun(context, size, virtual=False, action="set")
+
+@case("table.setColumn", "tk")
+def benchTableSetColumn(size, context):
+    return tableRun(context, size, virtual=False, action="setColumn")
+
+def tableRun(context, size, virtual, action):
+    """run() of a Table benchmark, a fresh table per run, only the action and drawing are timed"""
+    from table import Table
+    root = context["root"]
+    records = wlanRecords(size)
+    keys = ["changed-" + record[2] for record in records]
+
+    def run():
+        table = Table(root, virtual=virtual)
+        table.construct(["SSID", "Kind", "Key"], [150] * 3)
+        table.pack()
+        if action != "fill":
+            table.fill(records)
+            root.update_idletasks()
+        start = time.perf_counter()
+        if action == "fill":
+            table.fill(records)
+        elif action == "set":
+            for iid, key in zip(table.get_children(), keys):
+                table.set(iid, "4", key)
+        else:
+            table.setColumn("4", keys)
+        root.update_idletasks()     # include drawing and virtual rendering
+        elapsed = time.perf_counter() - start
+        table.destroy()
+        return elapsed
+    return run
+
+@case("displayKey", "profiles-tk")
+def benchDisplayKey(size, context):
+    """Toggle "Show password" of the Wi-Fi tab twice, with size profiles loaded"""
+    from tkinter.ttk import Frame
+    from main import WirelessProfiles
+    root = context["root"]
+    frame = Frame(root)
+    frame.pack()
+    profiles = WirelessProfiles(frame)
+    profiles._tblInfo.fill(wlanRecords(size))
+    root.update_idletasks()
+
+    def run():
+        start = time.perf_counter()
+        for _ in range(2):
+            profiles._checked.set(1 - profiles._checked.get())
+            profiles.displayKey()
+            root.update_idletasks()
+        return time.perf_counter() - start
+    return run
+
+@case("qr.render", "qr")
+def benchQr(size, context):
+    """Render size codes into an empty cache"""
+    payloads = [wifiPayload(*record) for record in wlanRecords(size)]
+
+    def run():
+        cache = QrCache()
+        return timed(lambda: [cache.xbm(payload) for payload in payloads])
+    return run
+
+def openDisplay():
+    """(Tk root, Xvfb process or None, reason why Tk is not available or None)"""
+    try:
+        from tkinter import Tk, TclError
+    except ImportError as e:
+        return None, None, "tkinter is not installed: " + str(e)
+    xvfb = None
+    if not os.environ.get("DISPLAY") and shutil.which("Xvfb"):
+        display = ":%d" % (100 + os.getpid() % 800)
+        xvfb = subprocess.Popen(["Xvfb", display, "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        socket = "/tmp/.X11-unix/X" + display[1:]
+        for _ in range(50):     # wait for the server to accept clients
+            if os.path.exists(socket):
+                break
+            time.sleep(0.1)
+        os.environ["DISPLAY"] = display
+    try:
+        root = Tk()     # stays mapped, so drawing is part of the timings
+        return root, xvfb, None
+    except TclError as e:
+        if xvfb is not None:
+            xvfb.terminate()
+        return None, None, "no display, install Xvfb or set DISPLAY: " + str(e)
+
+def measure(run, repeat):
+    """Statistics of repeat runs"""
+    times = [run() for _ in range(repeat)]
+    return {"repeat": repeat, "best": min(times), "median": statistics.median(times), "mean": statistics.mean(times)}
+
+def commit():
+    """Short hash of the checked out commit, None outside a git tree"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold, out):
+    """Print ratios of medians against a baseline, return number of regressions beyond threshold"""
+    old = {(entry["case"], entry["size"]): entry for entry in baseline["results"]}
+    regressions = 0
+    out.write("%-20s %8s %12s %12s %7s\n" % ("case", "size", "before ms", "after ms", "ratio"))
+    for entry in results:
+        before = old.get((entry["case"], entry["size"]))
+        if before is None:
+            continue
+        ratio = entry["median"] / before["median"] if before["median"] > 0 else float("inf")
+        flag = ""
+        if ratio > threshold:
+            regressions += 1
+            flag = "  slower"
+        out.write("%-20s %8d %12.3f %12.3f %7.2f%s\n" % (entry["case"], entry["size"], before["median"] * 1000,
+                                                          entry["median"] * 1000, ratio, flag))
+    return regressions
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, nargs="+", default=PROFILE_SIZES, help="profile counts")
+    parser.add_argument("--adapters", type=int, nargs="+", default=ADAPTER_SIZES, help="adapter counts")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", metavar="PREFIX", help="run cases whose names start with a prefix")
+    parser.add_argument("--output", metavar="PATH", help="write JSON results to PATH instead of stdout")
+    parser.add_argument("--compare", metavar="PATH", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="median ratio which counts as a regression")
+    args = parser.parse_args()
+
+    selected = [entry for entry in CASES if args.only is None or any(entry[0].startswith(prefix) for prefix in args.only)]
+    context = {"directory": tempfile.mkdtemp(prefix="netinfo-bench-"), "root": None}
+    skipped = []
+    xvfb = None
+    if any(group.endswith("tk") for name, group, factory in selected):
+        context["root"], xvfb, reason = openDisplay()
+        if reason is not None:
+            skipped += [{"case": name, "reason": reason} for name, group, factory in selected if group.endswith("tk")]
+    qrReason = None
+    try:
+        import pyqrcode
+    except ImportError:
+        qrReason = "pyqrcode is not installed"
+        skipped += [{"case": name, "reason": qrReason} for name, group, factory in selected if group == "qr"]
+
+    results = []
+    try:
+        for name, group, factory in selected:
+            if (group.endswith("tk") and context["root"] is None) or (group == "qr" and qrReason is not None):
+                continue
+            if group == "adapters":
+                sizes = args.adapters
+            elif group == "tk":
+                sizes = [size for size in args.profiles if size <= TK_MAX]
+            elif group == "qr":
+                sizes = sorted(set(min(size, QR_MAX) for size in args.profiles))
+            else:
+                sizes = args.profiles
+            for size in sizes:
+                entry = {"case": name, "size": size}
+                entry.update(measure(factory(size, context), args.repeat))
+                entry["perItem"] = entry["best"] / size
+                results.append(entry)
+                sys.stderr.write("%-20s %8d  best %10.3fms  median %10.3fms\n" %
+                                 (name, size, entry["best"] * 1000, entry["median"] * 1000))
+    finally:
+        if context["root"] is not None:
+            context["root"].destroy()
+        if xvfb is not None:
+            xvfb.terminate()
+        shutil.rmtree(context["directory"], ignore_errors=True)
+
+    report = {"commit": commit(), "python": platform.python_version(), "platform": platform.platform(),
+              "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": args.repeat,
+              "results": results, "skipped": skipped}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.threshold, sys.stderr)
+        return 1 if regressions != 0 else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Synthetic `netsh wlan` and `ipconfig /all` outputs of any size, deterministic for a given size.
+
+Used by run.py, bench_parse.py and bench_collect.py, and can write replay fixtures for the window or the CLI:
+
+    python benchmarks/synthetic.py --profiles 10000 --adapters 200 /tmp/big
+    NETINFO_REPLAY=/tmp/big python src/cli.py gui
+"""
+import os
+import sys
+import time
+from argparse import ArgumentParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from runner import CommandRunner, fixtureName
+
+KINDS = ("WPA2-Personal", "WPA3-Personal", "WPA2-Personal", "Open", "WPA2-Enterprise", "Shared")
+HOST_NAME = "BENCH-PC"
+
+def ssidOf(index):
+    """SSID of synthetic profile index, some contain characters which need quoting or escaping"""
+    if index % 7 == 3:
+        return "Guest; Net, %d" % index
+    return "Network %d" % index
+
+def keyOf(index):
+    """Key content of synthetic profile index, None for open and enterprise networks"""
+    kind = KINDS[index % len(KINDS)]
+    if kind in ("Open", "WPA2-Enterprise"):
+        return None
+    return "secret-%08x-%d" % (index * 2654435761 % (1 << 32), index)
+
+def wlanListing(count, interfaces=1):
+    """`netsh wlan show profiles` with count profiles spread over interfaces"""
+    lines = []
+    for interface in range(interfaces):
+        name = "Wi-Fi" if interface == 0 else "Wi-Fi " + str(interface + 1)
+        lines += ["", "Profiles on interface " + name + ":", "", "Group policy profiles (read only)",
+                  "---------------------------------", "    <None>", "", "User profiles", "-------------"]
+        for i in range(interface, count, interfaces):
+            scope = "Current User Profile " if i % 10 == 9 else "All User Profile     "
+            lines.append("    " + scope + ": " + ssidOf(i))
+    return "\n".join(lines) + "\n\n"
+
+def wlanProfile(index, noise=0):
+    """`netsh wlan show profiles name = "..." key = clear` of synthetic profile index, noise adds unrelated lines"""
+    ssid = ssidOf(index)
+    kind = KINDS[index % len(KINDS)]
+    key = keyOf(index)
+    lines = ["", "Profile " + ssid + " on interface Wi-Fi:", "=" * 71, "", "Applied: All User Profile", "",
+             "Profile information", "-------------------",
+             "    Version                : 1",
+             "    Type                   : Wireless LAN",
+             "    Name                   : " + ssid]
+    lines += ["    Extension %-11d: value" % i for i in range(noise)]
+    lines += ["    Control options        :",
+              "        Connection mode    : Connect automatically",
+              "        Network broadcast  : Connect only if this network is broadcasting",
+              "", "Connectivity settings", "---------------------",
+              "    Number of SSIDs        : 1",
+              "    SSID name              : \"" + ssid + "\"",
+              "    Network type           : Infrastructure",
+              "", "Security settings", "-----------------",
+              "    Authentication         : " + kind,
+              "    Cipher                 : CCMP"]
+    if index % 2 == 0:  # netsh repeats authentication for each supported cipher
+        lines += ["    Authentication         : " + kind, "    Cipher                 : GCMP"]
+    if key is None:
+        lines.append("    Security key           : Absent")
+    else:
+        lines += ["    Security key           : Present", "    Key Content            : " + key]
+    lines += ["", "Cost settings", "-------------", "    Cost                   : Unrestricted", "    Roaming                : No", ""]
+    return "\n".join(lines) + "\n"
+
+def wlanRecords(count):
+    """[ssid, kind, key] records like NetshWlan.listInfo of count synthetic profiles, without parsing"""
+    return [[ssidOf(i), KINDS[i % len(KINDS)], keyOf(i) or "None"] for i in range(count)]
+
+def _field(label, value):
+    """One dotted ipconfig line"""
+    return "   " + (label + " " + ". " * 20)[:33].rstrip() + " : " + value
+
+def ipconfigAll(adapters):
+    """`ipconfig /all` with a host section and adapters, adapter 0 is the one in use"""
+    lines = ["", "Windows IP Configuration", "",
+             _field("Host Name", HOST_NAME), _field("Primary Dns Suffix", ""), _field("Node Type", "Hybrid"),
+             _field("IP Routing Enabled", "No"), _field("WINS Proxy Enabled", "No"), _field("DNS Suffix Search List", "lan")]
+    for i in range(adapters):
+        wireless = i % 3 == 0
+        name = ("Wireless LAN adapter Wi-Fi " if wireless else "Ethernet adapter Ethernet ") + str(i)
+        lines += ["", name + ":", ""]
+        if i % 5 == 4:
+            lines += [_field("Media State", "Media disconnected"), _field("Connection-specific DNS Suffix", ""),
+                      _field("Description", "Synthetic adapter %d" % i),
+                      _field("Physical Address", "02-00-00-%02X-%02X-%02X" % (i >> 16 & 255, i >> 8 & 255, i & 255)),
+                      _field("DHCP Enabled", "Yes"), _field("Autoconfiguration Enabled", "Yes")]
+            continue
+        dhcp = i % 2 == 0
+        lines += [_field("Connection-specific DNS Suffix", "lan"),
+                  _field("Description", "Synthetic adapter %d" % i),
+                  _field("Physical Address", "02-00-00-%02X-%02X-%02X" % (i >> 16 & 255, i >> 8 & 255, i & 255)),
+                  _field("DHCP Enabled", "Yes" if dhcp else "No"), _field("Autoconfiguration Enabled", "Yes"),
+                  _field("Link-local IPv6 Address", "fe80::%x:1%%%d(Preferred)" % (i, i + 2)),
+                  _field("IPv4 Address", "10.%d.%d.2(Preferred)" % (i >> 8 & 255, i & 255)),
+                  _field("Subnet Mask", "255.255.255.0")]
+        if i == 0:
+            lines += [_field("Lease Obtained", "Sunday, October 18, 2026 8:02:11 AM"),
+                      _field("Lease Expires", "Monday, October 19, 2026 8:02:11 AM")]
+        lines += [_field("Default Gateway", "fe80::1%%%d" % (i + 2)), " " * 39 + "10.%d.%d.1" % (i >> 8 & 255, i & 255)]
+        if dhcp:
+            lines.append(_field("DHCP Server", "10.%d.%d.1" % (i >> 8 & 255, i & 255)))
+        lines += [_field("DNS Servers", "10.%d.%d.1" % (i >> 8 & 255, i & 255)), " " * 39 + "8.8.8.8",
+                  _field("NetBIOS over Tcpip", "Enabled")]
+    return "\n".join(lines) + "\n"
+
+class SyntheticRunner(CommandRunner):
+    def __init__(self, profiles=10, adapters=1, latency=0):
+        """Serve synthetic outputs, for timing collectors without Windows.
+
+        latency is seconds every command sleeps, like spawning netsh does on Windows."""
+        CommandRunner.__init__(self)
+        self.profiles = profiles
+        self.adapters = adapters
+        self.latency = latency
+        self._indexes = {ssidOf(i): i for i in range(profiles)}
+        self._listing = None
+        self._ipconfig = None
+
+    def _run(self, command):
+        """Output of a command, generated once per size"""
+        if self.latency:
+            time.sleep(self.latency)
+        if command == "netsh wlan show profiles":
+            if self._listing is None:
+                self._listing = wlanListing(self.profiles)
+            return self._listing
+        if command.startswith("netsh wlan show profiles name = \""):
+            ssid = command[len("netsh wlan show profiles name = \""):command.rindex("\"")]
+            return wlanProfile(self._indexes[ssid])
+        if command == "ipconfig /all":
+            if self._ipconfig is None:
+                self._ipconfig = ipconfigAll(self.adapters)
+            return self._ipconfig
+        if command == "hostname":
+            return HOST_NAME
+        raise LookupError("No synthetic output for command: " + command)
+
+def writeFixtures(directory, profiles, adapters):
+    """Write replay fixtures of a synthetic PC into directory"""
+    os.makedirs(directory, exist_ok=True)
+    commands = {"netsh wlan show profiles": wlanListing(profiles), "ipconfig /all": ipconfigAll(adapters), "hostname": HOST_NAME}
+    for i in range(profiles):
+        commands["netsh wlan show profiles name = \"" + ssidOf(i) + "\" key = clear"] = wlanProfile(i)
+    for command, output in commands.items():
+        with open(os.path.join(directory, fixtureName(command)), "w", encoding="utf-8") as file:
+            file.write(output)
+
+if __name__ == "__main__":
+    parser = ArgumentParser(description="Write replay fixtures of a synthetic PC")
+    parser.add_argument("--profiles", type=int, default=1000)
+    parser.add_argument("--adapters", type=int, default=50)
+    parser.add_argument("directory")
+    args = parser.parse_args()
+    writeFixtures(args.directory, args.profiles, args.adapters)
@@ -0,0 +1,202 @@
+"""Merge inventories of many hosts: exports of the Export buttons or the CLI, and snapshot databases.
+
+Files are read concurrently by a process pool, then merged into a Fleet which keeps indexes for
+queries such as which hosts store an SSID, which adapter owns a MAC or IP address, or which hosts
+have DHCP disabled. A host is named by a Host column when an export has one, by the Host Name of
+ipconfig in a snapshot, and by the file name up to its first dot otherwise ("pc-042.nics.csv")."""
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from export import readRecords, FORMATS
+from parsers import Nic
+
+SNAPSHOT_EXTENSION = ".db"
+HOST_FIELD = "Host"
+MAC_PATTERN = re.compile(r"^[0-9A-Fa-f]{2}([-:][0-9A-Fa-f]{2}){5}$")
+ADDRESS_LABELS = ("IPv4 Address", "IPv6 Address", "Temporary IPv6 Address", "Link-local IPv6 Address")
+
+def sourceFiles(paths):
+    """Exports and snapshot databases of paths, directories are walked"""
+    extensions = tuple("." + format for format in FORMATS) + tuple("." + format + ".gz" for format in FORMATS) + \
+                 (SNAPSHOT_EXTENSION,)
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, names in os.walk(path):
+                subdirectories.sort()
+                files += [os.path.join(directory, name) for name in sorted(names) if name.lower().endswith(extensions)]
+        else:
+            files.append(path)
+    return files
+
+def hostOf(path):
+    """Host name taken from a file name"""
+    return os.path.basename(path).split(".", 1)[0]
+
+def loadSource(path):
+    """Read one file into plain data: (path, [[host, profiles, nics]], error).
+
+    profiles are [ssid, kind, key] records and nics are [name, fields] pairs like IpConfig.toData().
+    Runs in worker processes, so everything it returns is picklable."""
+    try:
+        if path.lower().endswith(SNAPSHOT_EXTENSION):
+            return path, _loadSnapshots(path), None
+        return path, _loadExport(path), None
+    except Exception as e:
+        return path, [], str(e) or type(e).__name__
+
+def _loadSnapshots(path):
+    """Latest wlan and nics snapshots of a database, nothing for other databases such as Thumbs.db"""
+    from snapshot import SnapshotStore, WLAN, NICS
+    store = SnapshotStore(path, readOnly=True)     # inputs are never written
+    if not store.isStore():
+        return []
+    wlan = store.latest(WLAN)
+    nics = store.latest(NICS)
+    host = hostOf(path)
+    if nics is not None and nics.data["host"] is not None:
+        host = nics.data["host"].get("Host Name") or host
+    return [[host, wlan.data["listInfo"] if wlan is not None else [], nics.data["nics"] if nics is not None else []]]
+
+def _loadExport(path):
+    """Profiles or NICs of an export, grouped by Host column when there is one"""
+    fieldnames, records = readRecords(path)
+    column = fieldnames.index(HOST_FIELD) if HOST_FIELD in fieldnames else None
+    default = hostOf(path)
+    hosts = {}  # host -> [host, profiles, nics], in order of appearing
+    if "SSID" in fieldnames:
+        ssid, kind, key = fieldnames.index("SSID"), fieldnames.index("Kind"), fieldnames.index("Key")
+        for record in records:
+            host = record[column] if column is not None else default
+            entry = hosts.setdefault(host, [host, [], []])
+            entry[1].append([record[ssid], record[kind], record[key]])
+    elif "Adapter" in fieldnames:
+        adapter, label, value = fieldnames.index("Adapter"), fieldnames.index("Property"), fieldnames.index("Value")
+        nics = {}   # (host, adapter) -> Nic, repeated properties become lists like in ipconfig
+        for record in records:
+            host = record[column] if column is not None else default
+            entry = hosts.setdefault(host, [host, [], []])
+            nic = nics.get((host, record[adapter]))
+            if nic is None:
+                nic = nics[(host, record[adapter])] = Nic(record[adapter])
+                entry[2].append([nic.name, nic.fields])
+            nic.add(record[label], record[value])
+    else:
+        raise ValueError("Neither a profile nor a NIC export: " + ", ".join(fieldnames))
+    if len(hosts) == 0 and column is None:  # an empty inventory still tells the host exists
+        hosts[default] = [default, [], []]
+    return list(hosts.values())
+
+def _address(value):
+    """Address of an ipconfig value, without "(Preferred)" and similar suffixes"""
+    return value.split("(", 1)[0].strip().lower()
+
+def _mac(value):
+    """Physical address in one spelling: 8C-16-45-12-34-56"""
+    return value.strip().upper().replace(":", "-")
+
+class Fleet:
+    def __init__(self):
+        """Merged inventories of many hosts with indexes for queries"""
+        self.hosts = {}         # host -> {"profiles": number, "nics": [adapter names]}
+        self.failures = []      # (path, error) of files which could not be read
+        self._profiles = {}     # (ssid, kind) -> [{key: number of hosts}, set of hosts]
+        self._ssidHosts = {}    # ssid -> set of hosts, over all kinds
+        self._addresses = {}    # MAC, IPv4 or IPv6 address -> [(host, adapter)]
+        self._properties = {}   # (label, value) of single valued NIC properties -> [(host, adapter)]
+        self._records = None    # merged records, built when asked for
+
+    def add(self, host, profiles=(), nics=()):
+        """Merge profiles ([ssid, kind, key]) and NICs ([name, fields]) of a host"""
+        self._records = None
+        entry = self.hosts.setdefault(host, {"profiles": 0, "nics": []})
+        for ssid, kind, key in profiles:
+            merged = self._profiles.get((ssid, kind))
+            if merged is None:
+                merged = self._profiles[(ssid, kind)] = [{}, set()]
+            if host not in merged[1]:   # a host is counted once per profile
+                merged[1].add(host)
+                merged[0][key] = merged[0].get(key, 0) + 1
+                entry["profiles"] += 1
+            self._ssidHosts.setdefault(ssid, set()).add(host)
+        for name, fields in nics:
+            entry["nics"].append(name)
+            for label, value in fields.items():
+                if label == "Physical Address" or label in ADDRESS_LABELS:
+                    normalize = _mac if label == "Physical Address" else _address
+                    for item in (value if isinstance(value, list) else [value]):
+                        if item:
+                            self._addresses.setdefault(normalize(item), []).append((host, name))
+                elif not isinstance(value, list):
+                    self._properties.setdefault((label, value), []).append((host, name))
+
+    def merge(self, results):
+        """Merge results of loadSource"""
+        for path, hosts, error in results:
+            if error is not None:
+                self.failures.append((path, error))
+            for host, profiles, nics in hosts:
+                self.add(host, profiles, nics)
+
+    def records(self):
+        """Deduplicated profiles: [ssid, kind, key, number of hosts], key is the one most hosts store"""
+        if self._records is None:
+            self._records = []
+            for (ssid, kind), (keys, hosts) in sorted(self._profiles.items(), key=lambda item: (item[0][0].lower(), item[0][1])):
+                key = max(keys.items(), key=lambda item: item[1])[0]
+                self._records.append([ssid, kind, key, len(hosts)])
+        return self._records
+
+    def keysOf(self, ssid, kind):
+        """{key: number of hosts} of a merged profile, more than one key means hosts disagree"""
+        merged = self._profiles.get((ssid, kind))
+        return dict(merged[0]) if merged is not None else {}
+
+    def hostsWithSsid(self, ssid, kind=None):
+        """Sorted hosts which store a profile of an SSID, of one kind when it is given"""
+        if kind is None:
+            return sorted(self._ssidHosts.get(ssid, ()))
+        merged = self._profiles.get((ssid, kind))
+        return sorted(merged[1]) if merged is not None else []
+
+    def adapterOf(self, address):
+        """[(host, adapter)] owning a MAC, IPv4 or IPv6 address"""
+        key = _mac(address) if MAC_PATTERN.match(address.strip()) else _address(address)
+        return list(self._addresses.get(key, ()))
+
+    def adaptersWhere(self, label, value):
+        """[(host, adapter)] whose NIC property label has value, e.g. ("DHCP Enabled", "No")"""
+        return list(self._properties.get((label, value), ()))
+
+    def hostsWhere(self, label, value):
+        """Sorted hosts having at least one adapter whose property label has value"""
+        return sorted(set(host for host, adapter in self._properties.get((label, value), ())))
+
+    def dhcpDisabled(self):
+        """Sorted hosts having an adapter with DHCP disabled"""
+        return self.hostsWhere("DHCP Enabled", "No")
+
+def aggregate(paths, workers=None, cancelled=None):
+    """Read all exports and snapshots under paths with a process pool, return a Fleet.
+
+    workers=1 reads in this process. cancelled is an optional threading.Event."""
+    files = sourceFiles(paths)
+    fleet = Fleet()
+    if workers == 1 or len(files) <= 1:     # no need a pool for a single file
+        for path in files:
+            if cancelled is not None and cancelled.is_set():
+                break
+            fleet.merge([loadSource(path)])
+        return fleet
+
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(files) // (4 * workers))     # fewer round trips for many small files
+    context = multiprocessing.get_context("spawn")  # the GUI runs this in a thread next to Tk, forking it may deadlock
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        for result in executor.map(loadSource, files, chunksize=chunksize):
+            if cancelled is not None and cancelled.is_set():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            fleet.merge([result])
+    return fleet
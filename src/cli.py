@@ -0,0 +1,194 @@
+"""Headless entry point: collect wireless profiles or NICs without starting Tk.
+
+    python cli.py wlan [--workers 8] [--show-keys] [--output profiles.csv]
+    python cli.py nics [--output nics.jsonl.gz]
+    python cli.py --store snapshots.db wlan --cache
+    python cli.py history wlan
+    python cli.py diff nics 3 7
+    python cli.py aggregate exports/ --ssid HomeNet
+    python cli.py gui
+
+GUI and QR dependencies are imported only by the gui command."""
+import sys
+import time
+import instrument
+from argparse import ArgumentParser
+from collector import NetshWlan, IpConfig, DEFAULT_WORKERS
+from runner import defaultRunner, setDefaultRunner, ReplayRunner
+
+WLAN = "wlan"   # snapshot kinds as in snapshot.py, which is imported only by commands using a store
+NICS = "nics"
+
+def buildParser():
+    """Command line arguments of all commands"""
+    parser = ArgumentParser(description="Show 802.11 profiles and network interface cards of this PC")
+    parser.add_argument("--replay", metavar="DIRECTORY", help="replay captured command outputs instead of running them")
+    parser.add_argument("--stats", action="store_true", help="print time and bytes of every program to stderr")
+    parser.add_argument("--instrument", action="store_true", help="print stage times and counters to stderr")
+    parser.add_argument("--instrument-json", metavar="PATH", help="save stage times and counters as JSON")
+    parser.add_argument("--profile", metavar="PATH", help="run under cProfile and write pstats to PATH")
+    parser.add_argument("--store", metavar="PATH", help="snapshot database, default ~/.network-info-app/snapshots.db")
+    parser.add_argument("--ttl", type=float, help="seconds a snapshot is served by --cache, default 600")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    wlan = commands.add_parser("wlan", help="802.11 profiles")
+    wlan.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="netsh processes running at the same time")
+    wlan.add_argument("--show-keys", action="store_true", help="print keys instead of '*'")
+    wlan.add_argument("--output", metavar="PATH", help="export to .csv, .jsonl or .nib, optionally .gz, instead of printing")
+    wlan.add_argument("--cache", action="store_true", help="use a fresh snapshot instead of running netsh, save a new one otherwise")
+
+    nics = commands.add_parser("nics", help="network interface cards")
+    nics.add_argument("--output", metavar="PATH", help="export to .csv, .jsonl or .nib, optionally .gz, instead of printing")
+    nics.add_argument("--cache", action="store_true", help="use a fresh snapshot instead of running ipconfig, save a new one otherwise")
+
+    history = commands.add_parser("history", help="saved snapshots, newest first")
+    history.add_argument("kind", choices=(WLAN, NICS))
+
+    compare = commands.add_parser("diff", help="changes between two snapshots")
+    compare.add_argument("kind", choices=(WLAN, NICS))
+    compare.add_argument("old", type=int, help="id of the older snapshot, see history")
+    compare.add_argument("new", type=int, help="id of the newer snapshot")
+
+    fleet = commands.add_parser("aggregate", help="merge exports and snapshots of many hosts")
+    fleet.add_argument("paths", nargs="+", metavar="PATH", help="export, snapshot database or folder of them")
+    fleet.add_argument("--workers", type=int, help="processes reading files, default is number of CPUs")
+    fleet.add_argument("--show-keys", action="store_true", help="print keys instead of '*'")
+    fleet.add_argument("--ssid", help="print hosts which store this SSID")
+    fleet.add_argument("--address", help="print adapter which owns this MAC or IP address")
+    fleet.add_argument("--where", metavar="PROPERTY=VALUE", help="print adapters with a NIC property, e.g. 'DHCP Enabled=No'")
+    fleet.add_argument("--dhcp-disabled", action="store_true", help="print hosts having an adapter with DHCP disabled")
+
+    commands.add_parser("gui", help="start the window")
+    return parser
+
+def printRows(header, rows, out):
+    """Print rows as aligned text columns"""
+    rows = [header] + [[str(value) for value in row] for row in rows]
+    widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+    for row in rows:
+        out.write("  ".join(value.ljust(width) for value, width in zip(row, widths)).rstrip() + "\n")
+
+def openStore(args):
+    """SnapshotStore of --store and --ttl"""
+    from snapshot import SnapshotStore, DEFAULT_PATH, DEFAULT_TTL  # sqlite3, zlib and json are only needed here
+    return SnapshotStore(args.store or DEFAULT_PATH, ttl=args.ttl if args.ttl is not None else DEFAULT_TTL)
+
+def runWlan(args, out):
+    """wlan command, return exit code: 2 when some profiles could not be read"""
+    store = openStore(args) if args.cache else None
+    snapshot = store.fresh(WLAN) if store is not None else None
+    if snapshot is not None:
+        network = NetshWlan.fromData(snapshot.data)
+    else:
+        network = NetshWlan(workers=args.workers)
+        if store is not None and len(network.failures) == 0:    # an incomplete inventory is not served later
+            store.save(WLAN, network.toData())
+    if args.output:
+        from export import exportRecords, profileRecords, PROFILE_FIELDS
+        exportRecords(profileRecords(network.listInfo), args.output, PROFILE_FIELDS)
+    else:
+        printRows(["SSID", "Kind", "Key"],
+                  [[ssid, kind, key if args.show_keys else "*" * len(key)] for ssid, kind, key in network.listInfo], out)
+    for ssid, error in network.failures:
+        sys.stderr.write("Cannot read profile " + ssid + ": " + str(error) + "\n")
+    return 2 if len(network.failures) != 0 else 0
+
+def runNics(args, out):
+    """nics command, return exit code"""
+    store = openStore(args) if args.cache else None
+    snapshot = store.fresh(NICS) if store is not None else None
+    if snapshot is not None:
+        config = IpConfig.fromData(snapshot.data)
+    else:
+        config = IpConfig()
+        if store is not None:
+            store.save(NICS, config.toData())
+    if args.output:
+        from export import exportRecords, nicRecords, NIC_FIELDS
+        exportRecords(nicRecords(config.nics), args.output, NIC_FIELDS)
+        return 0
+    for name, nic in config.nics.items():
+        out.write(name + (" (current)" if name == config.current else "") + "\n")
+        width = max([len(label) for label, value in nic.rows()] + [0])
+        for label, value in nic.rows():     # continuation rows of multi-valued labels have no label
+            out.write("    " + label.ljust(width) + (" : " if label else "   ") + value + "\n")
+    return 0
+
+def runHistory(args, out):
+    """history command, return exit code"""
+    printRows(["ID", "Taken", "Bytes"],
+              [[id, time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(taken)), size]
+               for id, taken, size in openStore(args).history(args.kind)], out)
+    return 0
+
+def runDiff(args, out):
+    """diff command, return exit code: 1 when a snapshot does not exist"""
+    from snapshot import diff
+    store = openStore(args)
+    old, new = store.load(args.old), store.load(args.new)
+    for id, snapshot in ((args.old, old), (args.new, new)):
+        if snapshot is None or snapshot.kind != args.kind:
+            sys.stderr.write("No " + args.kind + " snapshot " + str(id) + "\n")
+            return 1
+    changes = diff(old, new)
+    for name in changes["added"]:
+        out.write("+ " + name + "\n")
+    for name in changes["removed"]:
+        out.write("- " + name + "\n")
+    for name, before, after in changes["changed"] if args.kind == WLAN else []:
+        out.write("~ " + name + ": " + before[1] + " -> " + after[1] + ("" if before[2] == after[2] else ", key changed") + "\n")
+    for name, labels in changes["changed"] if args.kind == NICS else []:
+        out.write("~ " + name + "\n")
+        for label, before, after in labels:
+            out.write("    " + label + ": " + str(before) + " -> " + str(after) + "\n")
+    return 0
+
+def runAggregate(args, out):
+    """aggregate command, return exit code: 2 when some files could not be read"""
+    from aggregate import aggregate     # process pool is only needed here
+    fleet = aggregate(args.paths, workers=args.workers)
+    if args.ssid is not None:
+        for host in fleet.hostsWithSsid(args.ssid):
+            out.write(host + "\n")
+    elif args.address is not None:
+        printRows(["Host", "Adapter"], fleet.adapterOf(args.address), out)
+    elif args.where is not None:
+        label, separator, value = args.where.partition("=")
+        printRows(["Host", "Adapter"], fleet.adaptersWhere(label.strip(), value.strip()), out)
+    elif args.dhcp_disabled:
+        for host in fleet.dhcpDisabled():
+            out.write(host + "\n")
+    else:
+        printRows(["SSID", "Kind", "Key", "Hosts"],
+                  [[ssid, kind, key if args.show_keys else "*" * len(key), hosts] for ssid, kind, key, hosts in fleet.records()], out)
+        out.write("Hosts: " + str(len(fleet.hosts)) + "\n")
+    for path, error in fleet.failures:
+        sys.stderr.write("Cannot read " + path + ": " + error + "\n")
+    return 2 if len(fleet.failures) != 0 else 0
+
+def main(argv=None, out=sys.stdout):
+    """Run a command, return exit code"""
+    args = buildParser().parse_args(argv)
+    if args.replay:
+        setDefaultRunner(ReplayRunner(args.replay))
+    if args.instrument or args.instrument_json:
+        instrument.enable()
+    if args.command == "gui":
+        from main import MainApp    # Tk, Table and widgets are only needed here
+        MainApp(profilePath=args.profile)   # profiles its loop itself, a second profiler would clash with it
+        return 0
+
+    commands = {"wlan": runWlan, "nics": runNics, "history": runHistory, "diff": runDiff, "aggregate": runAggregate}
+    with instrument.profiling(args.profile):
+        with instrument.stage("cli." + args.command):
+            code = commands[args.command](args, out)
+    if args.stats:
+        sys.stderr.write(defaultRunner().report() + "\n")
+    if args.instrument:
+        sys.stderr.write(instrument.formatReport() + "\n")
+    if args.instrument_json:
+        instrument.dump(args.instrument_json)
+    return code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import instrument
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from runner import defaultRunner
+from parsers import parseProfiles, parseProfileInfo, parseIpConfig, Profile, Nic, HOST_SECTION
+
+DEFAULT_WORKERS = 8     # number of netsh processes which are allowed to run at the same time
+
+def _lines(runner, command):
+    """Output of a command as lines, streamed when the runner supports it"""
+    stream = getattr(runner, "stream", None)
+    lines = stream(command) if stream is not None else runner(command).splitlines()
+    if instrument.ENABLED:
+        return instrument.counted(lines, "bytes parsed")
+    return lines
+
+class NetshWlan:
+    def __init__(self, workers=DEFAULT_WORKERS, runner=None, load=True, previous=None):
+        """Contruct a 2d array to save all networks' information, load=False only lists SSIDs.
+
+        previous is an earlier NetshWlan, its records are reused for profiles which are still listed
+        with the same scope and interface, so only new or changed profiles are queried."""
+        self._runner = runner if runner is not None else defaultRunner()    # callable which runs a command and returns its output
+        with instrument.stage("wlan.list"):
+            self.profiles = list(parseProfiles(_lines(self._runner, "netsh wlan show profiles")))    # entries with their scope and interface
+            self.listName = self.__getListName()
+        self.listInfo = []
+        self.failures = []      # pairs of (ssid, error) for profiles which could not be read
+        self._previous = previous
+        self.reused = 0         # number of records taken from previous
+        if load:
+            for result in self.iterLoad(workers):
+                pass
+
+    def toData(self):
+        """Plain data of profiles for saving in a snapshot"""
+        return {"profiles": [[profile.name, profile.scope, profile.interface] for profile in self.profiles],
+                "listInfo": self.listInfo}
+
+    @classmethod
+    def fromData(cls, data, runner=None):
+        """Rebuild a NetshWlan of toData without running any command, e.g. for showing a snapshot
+        or as previous of an incremental refresh"""
+        network = cls.__new__(cls)
+        network._runner = runner if runner is not None else defaultRunner()
+        network.profiles = [Profile(*entry) for entry in data["profiles"]]
+        network.listName = network.__getListName()
+        network.listInfo = [list(record) for record in data["listInfo"]]
+        network.failures = []
+        network._previous = None
+        network.reused = 0
+        return network
+
+    def iterLoad(self, workers=DEFAULT_WORKERS, cancelled=None):
+        """Fill listInfo and failures, yield (ssid, record, error) as soon as each profile is read"""
+        self.listInfo = []
+        self.failures = []
+        known = self.__reusable()
+        self.reused = 0
+        # closing the queries drops profiles which are not started yet, also when this generator is closed early
+        with closing(self.collect([ssid for ssid in self.listName if ssid not in known], workers, cancelled)) as queried:
+            for ssid in self.listName:
+                if ssid in known:
+                    ssid, record, error = ssid, known[ssid], None
+                    self.reused += 1
+                else:
+                    result = next(queried, None)
+                    if result is None:  # cancelled
+                        return
+                    ssid, record, error = result
+                if error is None:
+                    self.listInfo.append(record)
+                else:
+                    self.failures.append((ssid, error))
+                yield ssid, record, error
+
+    def __reusable(self):
+        """Records of previous which are still valid: ssid -> record"""
+        if self._previous is None:
+            return {}
+        metadata = {}
+        for profile in self.profiles:
+            metadata.setdefault(profile.name, []).append((profile.scope, profile.interface))
+        previousMetadata = {}
+        for profile in self._previous.profiles:
+            previousMetadata.setdefault(profile.name, []).append((profile.scope, profile.interface))
+        return {record[0]: record for record in self._previous.listInfo
+                if metadata.get(record[0]) == previousMetadata.get(record[0])}
+
+    def collect(self, listName, workers=DEFAULT_WORKERS, cancelled=None):
+        """Query profiles concurrently, yield (ssid, record, error) in the order of listName.
+
+        cancelled is an optional threading.Event, profiles which are not started yet are skipped once it is set
+        or the generator is closed; profiles which are running are not waited for."""
+        if workers <= 1:    # no need a pool for a single worker
+            for ssid in listName:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                yield self.__safeNetworkInfo(ssid)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = [executor.submit(self.__safeNetworkInfo, ssid) for ssid in listName]
+            for future in futures:  # keep original order of profiles
+                if cancelled is not None and cancelled.is_set():
+                    return
+                yield future.result()
+        finally:    # not a with block: its shutdown would wait for every queued profile
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def __safeNetworkInfo(self, ssid):
+        """Wrap __getNetworkInfo so that a broken profile does not abort the others"""
+        try:
+            with instrument.stage("wlan.profile"):  # process and parsing, in a worker thread
+                return ssid, self.__getNetworkInfo(ssid), None
+        except Exception as e:
+            return ssid, None, e
+
+    def __getListName(self):
+        """Get a list of SSID"""
+        listName = []
+        seen = set()
+        for profile in self.profiles:   # a profile may be listed for several interfaces, query it once
+            if profile.name not in seen:
+                seen.add(profile.name)
+                listName.append(profile.name)
+        return listName
+
+    def __getNetworkInfo(self, ssid):
+        """Get all information about current network"""
+        info = parseProfileInfo(_lines(self._runner, "netsh wlan show profiles name = \"" + ssid + "\" key = clear"))
+        if "Authentication" not in info:
+            raise ValueError("No authentication found in profile " + ssid)
+        return [ssid, info["Authentication"], info.get("Key Content", "None")]
+
+class IpConfig:
+    def __init__(self, runner=None, load=True):
+        """Get all network interface cards and their infomation"""
+        self._runner = runner if runner is not None else defaultRunner()
+        self.host = None    # Nic of "Windows IP Configuration", global settings of PC
+        self.nics = {}      # index: NIC's name -> Nic
+        self.current = None     # name of NIC which PC is using
+        if load:
+            for nic in self.iterLoad():
+                pass
+
+    def toData(self):
+        """Plain data of NICs for saving in a snapshot"""
+        return {"host": self.host.fields if self.host is not None else None,
+                "nics": [[nic.name, nic.fields] for nic in self.nics.values()]}
+
+    @classmethod
+    def fromData(cls, data, runner=None):
+        """Rebuild an IpConfig of toData without running any command"""
+        config = cls(runner=runner, load=False)
+        if data["host"] is not None:
+            config.host = Nic.fromFields(HOST_SECTION, data["host"])
+        for name, fields in data["nics"]:
+            nic = Nic.fromFields(name, fields)
+            config.nics[name] = nic
+            if nic.current:
+                config.current = name
+        return config
+
+    def iterLoad(self):
+        """Parse network interface cards' infomation once into Nic records, yield each NIC as soon as it is parsed"""
+        self.host = None
+        self.nics = {}
+        self.current = None
+        with instrument.stage("nics.load"):    # includes the time a consumer holds each NIC
+            for nic in parseIpConfig(_lines(self._runner, "ipconfig /all")):
+                if nic.name == HOST_SECTION:
+                    self.host = nic
+                    continue
+                self.nics[nic.name] = nic
+                if nic.current:
+                    self.current = nic.name
+                yield nic
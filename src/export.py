@@ -0,0 +1,224 @@
+import csv
+import gzip
+import io
+import json
+import sys
+from array import array
+from itertools import accumulate
+
+PROFILE_FIELDS = ("ID", "SSID", "Kind", "Key")
+NIC_FIELDS = ("Adapter", "Property", "Value")
+FORMATS = ("csv", "jsonl", "nib")   # nib: compact binary format of this app
+BATCH_SIZE = 1000                   # records which are encoded before one write
+BUFFER_SIZE = 1 << 16
+MAGIC = b"NIB1"
+
+def profileRecords(listInfo):
+    """Records of wireless profiles for exporting, listInfo is any iterable of [ssid, kind, key]"""
+    for i, record in enumerate(listInfo):
+        yield [i + 1, record[0], record[1], record[2]]
+
+def nicRecords(nics):
+    """Records of NICs for exporting, one record per value, nics is IpConfig.nics or any iterable of Nic"""
+    for nic in (nics.values() if isinstance(nics, dict) else nics):
+        for label, value in nic.fields.items():
+            if isinstance(value, list):
+                for item in value:
+                    yield [nic.name, label, item]
+            else:
+                yield [nic.name, label, value]
+
+def detectFormat(path):
+    """(format, compressed) from extension of path, e.g. "profiles.jsonl.gz" -> ("jsonl", True)"""
+    name = path.lower()
+    compressed = name.endswith(".gz")
+    if compressed:
+        name = name[:-3]
+    for format in FORMATS:
+        if name.endswith("." + format):
+            return format, compressed
+    return "csv", compressed
+
+def _open(path, mode, compressed):
+    """Open a file in binary mode, gzip compressed or buffered"""
+    if compressed:
+        return gzip.open(path, mode, compresslevel=6)
+    return open(path, mode, buffering=BUFFER_SIZE)
+
+def exportRecords(records, path, fieldnames, format=None, compress=None):
+    """Stream records (any iterable, e.g. a generator) into a file in batches, return number of records.
+
+    format and compress are taken from extension of path when they are not given."""
+    detected, compressed = detectFormat(path)
+    format = format or detected
+    compress = compressed if compress is None else compress
+    with _open(path, "wb", compress) as file:
+        if format == "csv":
+            return _writeCsv(records, file, fieldnames)
+        if format == "jsonl":
+            return _writeJsonLines(records, file, fieldnames)
+        if format == "nib":
+            return _writeBinary(records, file, fieldnames)
+        raise ValueError("Unknown export format: " + str(format))
+
+def _batches(records):
+    """Split an iterable of records into lists of BATCH_SIZE"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if len(batch) != 0:
+        yield batch
+
+def _writeCsv(records, file, fieldnames):
+    """Header, then records by batches"""
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="", write_through=True)
+    try:
+        writer = csv.writer(text)
+        writer.writerow(fieldnames)
+        count = 0
+        for batch in _batches(records):
+            writer.writerows(batch)
+            count += len(batch)
+        return count
+    finally:
+        text.detach()   # file is closed by caller
+
+def _writeJsonLines(records, file, fieldnames):
+    """One JSON object per line, a batch is encoded into one write.
+
+    Without records the file is one line with fieldnames as a JSON array, so they survive a round trip like a CSV header."""
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    count = 0
+    for batch in _batches(records):
+        lines = [encoder.encode(dict(zip(fieldnames, record))) for record in batch]
+        file.write(("\n".join(lines) + "\n").encode("utf-8"))
+        count += len(batch)
+    if count == 0:
+        file.write((encoder.encode(list(fieldnames)) + "\n").encode("utf-8"))
+    return count
+
+def _varint(number, out):
+    """Append an unsigned LEB128 number to a bytearray"""
+    while number >= 0x80:
+        out.append((number & 0x7F) | 0x80)
+        number >>= 7
+    out.append(number)
+
+def _writeBinary(records, file, fieldnames):
+    """MAGIC, field count and fields, then one block per batch: value count, character lengths of
+    values as uint32 array, byte length of text and the UTF-8 text of all values joined"""
+    header = bytearray(MAGIC)
+    _varint(len(fieldnames), header)
+    for field in fieldnames:
+        encoded = field.encode("utf-8")
+        _varint(len(encoded), header)
+        header += encoded
+    file.write(header)
+    count = 0
+    for batch in _batches(records):
+        values = [str(value) for record in batch for value in record]
+        lengths = array("I", map(len, values))
+        if sys.byteorder != "little":
+            lengths.byteswap()
+        text = "".join(values).encode("utf-8")
+        block = bytearray()
+        _varint(len(values), block)
+        block += lengths.tobytes()
+        _varint(len(text), block)
+        file.write(block)
+        file.write(text)
+        count += len(batch)
+    return count
+
+def readRecords(path, format=None, compress=None):
+    """Load an export back: (fieldnames, iterator of records as lists of strings)"""
+    detected, compressed = detectFormat(path)
+    format = format or detected
+    compress = compressed if compress is None else compress
+    file = _open(path, "rb", compress)
+    if format == "csv":
+        reader = csv.reader(io.TextIOWrapper(file, encoding="utf-8", newline=""))
+        fieldnames = tuple(next(reader, ()))
+        return fieldnames, _closing(file, reader)
+    if format == "jsonl":
+        first = file.readline()
+        if first.strip() == b"":
+            file.close()
+            return (), iter(())
+        record = json.loads(first)
+        fieldnames = tuple(record)
+        if isinstance(record, list):    # field names of an empty export
+            return fieldnames, _closing(file, _jsonRecords(b"", file, fieldnames))
+        return fieldnames, _closing(file, _jsonRecords(first, file, fieldnames))
+    if format == "nib":
+        return _readBinary(file)
+    file.close()
+    raise ValueError("Unknown export format: " + str(format))
+
+def _closing(file, records):
+    """Close file when records are exhausted"""
+    try:
+        yield from records
+    finally:
+        file.close()
+
+def _jsonRecords(first, file, fieldnames):
+    """Records of JSON lines, first line is read already for knowing fieldnames"""
+    for line in _chain(first, file):
+        if line.strip() != b"":
+            record = json.loads(line)
+            yield [str(record.get(field, "")) for field in fieldnames]
+
+def _chain(first, lines):
+    """first, then lines"""
+    yield first
+    yield from lines
+
+def _readBinary(file):
+    """Decode a file of _writeBinary, each block is decoded and sliced at once"""
+    data = file.read()      # bulk load, decoding works on one buffer
+    file.close()
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an export of this app")
+    position = len(MAGIC)
+
+    def varint():
+        nonlocal position
+        number = 0
+        shift = 0
+        while True:
+            byte = data[position]
+            position += 1
+            number |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return number
+            shift += 7
+
+    fieldnames = []
+    for _ in range(varint()):
+        length = varint()
+        fieldnames.append(data[position:position + length].decode("utf-8"))
+        position += length
+    fieldnames = tuple(fieldnames)
+
+    def records():
+        nonlocal position
+        width = len(fieldnames)
+        while position < len(data):
+            count = varint()
+            lengths = array("I")
+            lengths.frombytes(data[position:position + 4 * count])
+            if sys.byteorder != "little":
+                lengths.byteswap()
+            position += 4 * count
+            size = varint()
+            text = data[position:position + size].decode("utf-8")
+            position += size
+            ends = list(accumulate(lengths))
+            values = [text[start:end] for start, end in zip([0] + ends, ends)]
+            for i in range(0, count, width):
+                yield values[i:i + width]
+    return fieldnames, records()
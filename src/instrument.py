@@ -0,0 +1,161 @@
+"""Switchable instrumentation of collection and UI paths.
+
+Stages record wall time, counters record numbers such as rows inserted or bytes parsed.
+Everything is off unless NETINFO_INSTRUMENT is set or enable() is called, then stage() returns
+a shared no-op context and count() returns at once, so instrumented code pays one call.
+
+    with instrument.stage("wlan.list"):
+        ...
+    instrument.count("table.rows")
+
+Stages which run in worker threads add up their wall time, it may exceed the elapsed time."""
+import json
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+ENABLED = bool(os.environ.get("NETINFO_INSTRUMENT"))
+PROFILE_PATH = os.environ.get("NETINFO_PROFILE")    # cProfile output of the window, opt-in
+
+_lock = Lock()
+_stages = {}    # name -> [calls, seconds, longest]
+_counters = {}  # name -> number
+
+def enable(on=True):
+    """Switch instrumentation on or off, collected data is kept"""
+    global ENABLED
+    ENABLED = on
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+def stage(name):
+    """Context manager timing a stage, no-op when instrumentation is off"""
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(name)
+
+def clock():
+    """Start of a stage which does not fit a with block, e.g. it spans Tk callbacks; pass it to finish()"""
+    return time.perf_counter() if ENABLED else None
+
+def finish(name, started):
+    """Record a stage started by clock()"""
+    if started is not None:
+        record(name, time.perf_counter() - started)
+
+def record(name, seconds):
+    """Add one run of a stage"""
+    with _lock:
+        entry = _stages.get(name)
+        if entry is None:
+            _stages[name] = [1, seconds, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+            if seconds > entry[2]:
+                entry[2] = seconds
+
+def count(name, amount=1):
+    """Add to a counter, no-op when instrumentation is off"""
+    if not ENABLED:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def counted(lines, name):
+    """Pass lines through and count their characters, used for bytes parsed"""
+    size = 0
+    try:
+        for line in lines:
+            size += len(line)
+            yield line
+    finally:
+        count(name, size)
+
+def reset():
+    """Forget collected data"""
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+def report(runner=None):
+    """Structured report: {"stages": {name: {calls, seconds, mean, longest}}, "counters": {...}, "commands": {...}}.
+
+    commands are the subprocess stats of runner (default runner when not given), grouped by program."""
+    if runner is None:
+        from runner import defaultRunner
+        runner = defaultRunner()
+    with _lock:
+        stages = {name: {"calls": calls, "seconds": seconds, "mean": seconds / calls, "longest": longest}
+                  for name, (calls, seconds, longest) in sorted(_stages.items())}
+        counters = dict(sorted(_counters.items()))
+    commands = {program: {"calls": calls, "seconds": seconds, "bytes": size}
+                for program, (calls, seconds, size) in sorted(runner.summary().items())}
+    return {"enabled": ENABLED, "stages": stages, "counters": counters, "commands": commands}
+
+def formatReport(data=None):
+    """Human readable report"""
+    data = data if data is not None else report()
+    lines = []
+    for name, entry in data["stages"].items():
+        lines.append("%-22s calls: %-6d time: %.3fs  mean: %.2fms  longest: %.2fms" %
+                     (name, entry["calls"], entry["seconds"], entry["mean"] * 1000, entry["longest"] * 1000))
+    for name, number in data["counters"].items():
+        lines.append("%-22s %d" % (name, number))
+    for program, entry in data["commands"].items():
+        lines.append("%-22s calls: %-6d time: %.3fs  bytes: %d" % ("run " + program, entry["calls"], entry["seconds"], entry["bytes"]))
+    return "\n".join(lines)
+
+def statusLine(data=None):
+    """One line for a status bar: slowest stages and the main counters"""
+    data = data if data is not None else report()
+    stages = sorted(data["stages"].items(), key=lambda item: item[1]["seconds"], reverse=True)[:3]
+    parts = ["%s %.0fms" % (name, entry["seconds"] * 1000) for name, entry in stages]
+    parts += ["%s %d" % (name, number) for name, number in data["counters"].items()]
+    processes = sum(entry["calls"] for entry in data["commands"].values())
+    parts.append("processes %d" % processes)
+    return "  |  ".join(parts)
+
+def dump(path, data=None):
+    """Write report as JSON"""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(data if data is not None else report(), file, indent=2)
+
+@contextmanager
+def profiling(path):
+    """Run a block under cProfile and write pstats to path, nothing happens when path is None"""
+    if path is None:
+        yield None
+        return
+    import cProfile     # imported only when profiling is asked for
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
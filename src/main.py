@@ -1,94 +1,68 @@
 from tkinter import *
 from tkinter.ttk import *
-from tkinter.filedialog import asksaveasfile
+from tkinter.filedialog import asksaveasfilename, askdirectory
 from tkinter.messagebox import showinfo
-from collections import OrderedDict
-from subprocess import getoutput
-from csv import DictWriter
-from pyqrcode import pyqrcode
+from contextlib import closing
+from sqlite3 import Error as StoreError
+from time import localtime, strftime
 from table import Table
+from collector import NetshWlan, IpConfig
+from runner import defaultRunner
+from worker import BackgroundTask
+from qrcache import QrCache, wifiPayload
+from export import exportRecords, profileRecords, nicRecords, PROFILE_FIELDS, NIC_FIELDS
+from snapshot import SnapshotStore, WLAN, NICS
+from monitor import Monitor
+from aggregate import aggregate
+from search import ProfileIndex, NicIndex
+import instrument
+
+PREWARM_ROWS = 5   # QR codes of rows around selection which are rendered in background
+EXPORT_TYPES = [("CSV UTF-8 (Comma delimited)", "*.csv"), ("JSON lines", "*.jsonl"), ("Compact binary", "*.nib"),
+                ("Gzip compressed", "*.csv.gz *.jsonl.gz *.nib.gz")]
+FLEET_QUERIES = ("Hosts storing SSID", "Adapter of MAC or IP", "Hosts with DHCP disabled", "Adapters where Property=Value")
+STATUS_INTERVAL = 1000  # milliseconds between two updates of instrumentation status bar
+ALL_KINDS = "All kinds"     # kind filter which keeps every profile
+
+def saveSnapshot(store, kind, data):
+    """Save a snapshot when there is a store, a broken store must not break loading"""
+    if store is not None:
+        try:
+            store.save(kind, data)
+        except StoreError:
+            pass
 
-class NetshWlan:
-    def __init__(self):
-        """Contruct a 2d array to save all networks' information"""
-        self.listName = self.__getListName()
-        self.listInfo = []
-        for element in self.listName:
-            record = self.__getNetworkInfo(element)
-            self.listInfo.append(record)
-    
-    def __getListName(self):
-        """Get a list of SSID"""
-        chunkLine = getoutput("netsh wlan show profiles").split('\n')   # split command content into multiple lines
-
-        i = 0
-        while i < len(chunkLine):
-            if chunkLine[i].find('All User Profile') == -1: # remove unnecessary line
-                chunkLine.remove(chunkLine[i])
-                i -= 1
-            else:
-                chunkLine[i] = chunkLine[i].replace('    All User Profile     : ', '')  # delete header of SSID
-            i += 1
-        return chunkLine
-
-    def __getNetworkInfo(self, ssid):
-        """Get all information about current network"""
-        rawInfo = getoutput("netsh wlan show profiles name = \"" + ssid + "\" key = clear")
-        chunkInfo = rawInfo.split('\n')
-
-        i = 0
-        while i < len(chunkInfo):
-            if chunkInfo[i].find("Authentication") == -1 and \
-            chunkInfo[i].find("Key") == -1:
-                chunkInfo.remove(chunkInfo[i])
-                i -= 1
-            i += 1
-
-        chunkInfo[0] = chunkInfo[0].replace("    Authentication         : ", "")
-        if chunkInfo[1].find("Authentication") != -1:
-            chunkInfo.remove(chunkInfo[1])
-            chunkInfo[1] = chunkInfo[1].replace("    Key Content            : ", "")
-        else:
-            chunkInfo[1] = "None"
-        return [ssid, chunkInfo[0], chunkInfo[1]]
-
-class IpConfig:
-    def __init__(self):
-        """Get all network interface cards and their infomation"""
-        self.nics = self.__createNics()
-
-    def __createNics(self):
-        """Get raw network interface cards' infomation"""
-        chunkLine = getoutput("ipconfig /all").split("\n")
-
-        nics = {}
-        name = ""
-        for i in range(1, len(chunkLine)):
-            if chunkLine[i] == "":  # if null line then skip
-                continue
-            elif chunkLine[i - 1] == "" and chunkLine[i + 1] == "": # if a nics' name then push to dict as a key
-                name = chunkLine[i]
-                if name[len(name) - 1] == ":":
-                    name = name.replace(":", "")
-                nics[name] = ""
-            else:   # if a detail just simply append to dict[current key]
-                if nics[name] != "":    # first line, do not append "\n"
-                    nics[name] += "\n" 
-                nics[name] += chunkLine[i].replace("   ", "")
-        return nics
+def snapshotTime(snapshot):
+    """Text telling when a snapshot was taken"""
+    return "snapshot of " + strftime("%Y-%m-%d %H:%M", localtime(snapshot.taken))
 
 class WirelessProfiles:
-    def __init__(self, parent):
-        """Contruct a window about 802.11 profiles"""
+    def __init__(self, parent, store=None):
+        """Contruct a window about 802.11 profiles, the latest snapshot of store is shown at once"""
         self._window = parent
 
         self._lblTitle = Label(self._window, text = "802.11 PROFILES", font = 10)
         self._lblTitle.grid(row=0, column=0, columnspan=2, padx=(10, 0), pady=(10, 0))
 
-        self._tblInfo = Table(self._window)
+        self._tblInfo = Table(self._window, virtual=True)     # only visible rows are materialized, for very large lists
         self._tblInfo.construct(["SSID", "Kind", "Key"], [150] * 3)
+        self._tblInfo.mask("4")    # key column, masked and clear keys are rendered once per row
+        self._tblInfo.showMasked(True)
         self._tblInfo.grid(row=1, column=0, rowspan=5, padx=(25, 0), pady=(10, 0))
-        self._tblInfo.bind("<ButtonRelease-1>", self._on_click)
+        self._tblInfo.bind("<<TreeviewSelect>>", self._on_click)   # clicks and arrow keys
+        self._tblInfo.enableSorting()
+
+        self._fFilter = Frame(self._window)
+        self._fFilter.grid(row=6, column=0, sticky=NW, padx=(25, 0), pady=(10, 0))
+        self._lblFilter = Label(self._fFilter, text="Filter")
+        self._lblFilter.grid(row=0, column=0, sticky=W)
+        self._txtFilter = Entry(self._fFilter, width=30)   # SSID contains text, "^text" for SSID starts with text
+        self._txtFilter.grid(row=0, column=1, sticky=W, padx=(10, 0))
+        self._txtFilter.bind("<KeyRelease>", lambda event: self.filterData())
+        self._cbKind = Combobox(self._fFilter, values=(ALL_KINDS,), state="readonly", width=20)
+        self._cbKind.current(0)
+        self._cbKind.grid(row=0, column=2, sticky=W, padx=(10, 0))
+        self._cbKind.bind("<<ComboboxSelected>>", lambda event: self.filterData())
         
         self._fTabRight = Frame(self._window)
         self._fTabRight.grid(row=1, column=1, sticky=NW, padx=(10, 10), pady=(10, 0))
@@ -121,16 +95,64 @@ class WirelessProfiles:
         self._chkbtnShow.grid(row=1, column=0, sticky=NW, pady=(7, 0))
         self._btnLoad = Button(self._fTabRight, text="Load from system", width=30, command=self.loadData)
         self._btnLoad.grid(row=2, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
+        self._btnRefresh = Button(self._fTabRight, text="Refresh changes", width=30, command=self.refreshData)
+        self._btnRefresh.grid(row=3, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
+        self._btnCancel = Button(self._fTabRight, text="Cancel loading", width=30, state=DISABLED, command=self.cancelLoading)
+        self._btnCancel.grid(row=4, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
         self._btnSave = Button(self._fTabRight, text="Export", width=30, command=self.exportData)
-        self._btnSave.grid(row=3, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
+        self._btnSave.grid(row=5, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
         self._btnClear = Button(self._fTabRight, text="Clear all", width=30, command=self.clearData)
-        self._btnClear.grid(row=4, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
+        self._btnClear.grid(row=6, column=0, sticky=NW, padx=(0, 10), pady=(7, 0))
 
         self._lblReport = Label(self._window, text="Total: 0")
-        self._lblReport.grid(row=6, column=0, columnspan=2, sticky=NW, padx=(25, 0), pady=(10, 10))
+        self._lblReport.grid(row=7, column=0, columnspan=2, sticky=NW, padx=(25, 0), pady=(10, 10))
+
+        self._listNetwork = None
+        self._index = ProfileIndex()    # SSIDs, kinds and counts of rows in table, in the same order
+        self._qrCache = QrCache()
+        self._loading = None    # NetshWlan which is being loaded
+        self._loadingIndex = None   # ProfileIndex of it, built by the worker when refreshing
+        self._refresh = False   # whether loading only applies differences to table
+        self._task = None   # BackgroundTask which is loading profiles or the snapshot
+        self._snapshot = None   # snapshot which is shown until the first load
+        self._store = store
+        if store is not None:
+            self.__showSnapshot()
+
+    def __showSnapshot(self):
+        """Show the latest snapshot, revalidate it in background when it is older than ttl"""
+        self._task = BackgroundTask(self._window, self.__produceSnapshot, self.__onSnapshot, self.__onSnapshotDone).start()
+
+    def __produceSnapshot(self, cancelled):
+        """Worker thread: read the latest snapshot and index its profiles, which takes long with many profiles"""
+        try:
+            snapshot = self._store.latest(WLAN)
+        except StoreError:
+            return
+        if snapshot is not None:
+            network = NetshWlan.fromData(snapshot.data)
+            yield snapshot, network, ProfileIndex(network.listInfo)
+
+    def __onSnapshot(self, item):
+        """Tk loop: show the snapshot which is read"""
+        self._snapshot, self._listNetwork, self._index = item
+        for record in self._listNetwork.listInfo:
+            self._tblInfo.append(record, key=record[0])
+        self.__updateKinds()
+        self._lblReport.configure(text=self.__report() + "(" + snapshotTime(self._snapshot) + ")")
+
+    def __onSnapshotDone(self, error, cancelled):
+        """Tk loop: reading snapshot finishes"""
+        if error is None and not cancelled and self._snapshot is not None and self._snapshot.age > self._store.ttl:
+            self.__startLoading(refresh=True, reuse=False)  # keys may be changed, so every profile is read again
 
     def _on_click(self, event):
         """Binding between table and entries"""
+        with instrument.stage("gui.wlan.click"):
+            self.__showRecord()
+
+    def __showRecord(self):
+        """Fill entries and QR code of focused row"""
         currentRecord = self._tblInfo.item(self._tblInfo.focus(), "values")
         
         if currentRecord != "":     # solve exception: click on header line
@@ -148,87 +170,182 @@ class WirelessProfiles:
             self._txtKey.delete(0, END)
             self._txtKey.insert(END, currentRecord[3])
             self._txtKey.configure(state="readonly")
-            # convert current key (at focusing in table) to qr code
+            # convert current network (at focusing in table) to qr code
             # do not use string in txtKey because it may be wrong when is in hidden password mode "*""
-            content = self._listNetwork.listInfo[self._tblInfo.item(self._tblInfo.focus())["values"][0] - 1][2]
-            codeXbm = pyqrcode.create(content).xbm(scale=4)
-            self._codeBmp = BitmapImage(data=codeXbm)
-            self._codeBmp.config(foreground="black", background="white")
+            index = self._tblInfo.item(self._tblInfo.focus())["values"][0] - 1
+            self._codeBmp = self._qrCache.image(wifiPayload(*self._listNetwork.listInfo[index]))
+            self._cvQr.delete("all")    # do not stack images of previous clicks
             self._cvQr.create_image(0, 0, anchor=NW, image=self._codeBmp)
+            # render neighbours on screen in background, so browsing by arrow keys does not stutter when sorted or filtered
+            rows = self._tblInfo.get_children()
+            try:
+                position = rows.index(self._tblInfo.focus())
+            except ValueError:  # focused row is filtered out
+                rows, position = (), 0
+            nearby = [self._listNetwork.listInfo[self._tblInfo.item(iid)["values"][0] - 1]
+                      for iid in rows[max(0, position - PREWARM_ROWS):position + PREWARM_ROWS + 1]]
+            self._qrCache.prewarm([wifiPayload(*record) for record in nearby])
+
+    def filterData(self):
+        """Show only profiles whose SSID contains filter text and which are of the chosen kind, by the index"""
+        with instrument.stage("gui.wlan.filter"):
+            if self.__filtering():
+                positions = self._index.search(self._txtFilter.get(), self.__kind())
+                self._tblInfo.view(positions)
+                self._lblReport.configure(text=self.__report() + "Shown: " + str(len(positions)))
+            else:
+                self._tblInfo.view(None)
+                self._lblReport.configure(text=self.__report())
+
+    def __filtering(self):
+        """Whether filter text or kind filter is set"""
+        return self._txtFilter.get().strip() != "" or self.__kind() is not None
+
+    def __kind(self):
+        """Kind which is filtered, None for all kinds"""
+        kind = self._cbKind.get()
+        return None if kind == ALL_KINDS else kind
+
+    def __updateKinds(self):
+        """Offer kinds which are loaded in kind filter"""
+        self._cbKind.configure(values=(ALL_KINDS,) + tuple(sorted(self._index.counts)))
 
     def displayKey(self):
         """Set wifi key whether is hidden or displayed"""
-        if self._checked.get():     # case all keys are displayed
-            if len(self._tblInfo.get_children()) != 0:  # when data are loaded before
-                i = 0
-                for row in self._tblInfo.get_children():
-                    self._tblInfo.set(row, column="4", value=self._listNetwork.listInfo[i][2])
-                    i += 1
-                if self._tblInfo.item(self._tblInfo.focus())["values"] != "":   # solve exception: there is no focusing in table
-                    self._txtKey.configure(state=NORMAL)
-                    self._txtKey.delete(0, END)
-                    self._txtKey.insert(END, self._tblInfo.item(self._tblInfo.focus())["values"][3])
-                    self._txtKey.configure(state="readonly")
-        else:   # case all keys are hidden
-            if len(self._tblInfo.get_children()) != 0:
-                i = 0
-                for row in self._tblInfo.get_children():
-                    self._tblInfo.set(row, column="4", value="*"*len(self._listNetwork.listInfo[i][2]))
-                    i += 1
-                if self._tblInfo.item(self._tblInfo.focus())["values"] != "":   # solve exception: there is no focusing in table
-                    self._txtKey.configure(state=NORMAL)
-                    self._txtKey.delete(0, END)
-                    self._txtKey.insert(END, self._tblInfo.item(self._tblInfo.focus())["values"][3])
-                    self._txtKey.configure(state="readonly")
+        with instrument.stage("gui.wlan.displayKey"):
+            self._tblInfo.showMasked(not self._checked.get())   # one batched update of key column
+        if self._tblInfo.item(self._tblInfo.focus())["values"] != "":   # solve exception: there is no focusing in table
+            self._txtKey.configure(state=NORMAL)
+            self._txtKey.delete(0, END)
+            self._txtKey.insert(END, self._tblInfo.item(self._tblInfo.focus())["values"][3])
+            self._txtKey.configure(state="readonly")
 
     def loadData(self):
-        """Load data to table"""
+        """Load data to table in background, each row appears as soon as its profile is read"""
+        if self._task is not None and self._task.running:   # still loading
+            return
         self.clearData()    # clear first for not being appended later
-
-        self._listNetwork = NetshWlan()
-        self._tblInfo.fill(self._listNetwork.listInfo)
-
-        if not self._checked.get(): # if do not show key (not checked), turn all keys into "*" character
-            i = 0
-            for row in self._tblInfo.get_children():
-                self._tblInfo.set(row, column="4", value="*"*len(self._listNetwork.listInfo[i][2]))
-                i += 1
-        showinfo("Infomation", "Load all profiles from system successfully")
-
-        report = "Total: " + str(len(self._listNetwork.listInfo))
-        if len(self._listNetwork.listInfo) != 0:    # there is at least one row
-            frequency = {}  # dictionary to store frequency of each kind
-            for kind in self._listNetwork.listInfo: # traverse kind of network profiles to count their occurences
-                if kind[1] in frequency:
-                    frequency[kind[1]] += 1
-                else:
-                    frequency[kind[1]] = 1
-            frequency = OrderedDict(sorted(frequency.items()))  # cast dict into ordered and (for) sort it
-
-            report += "      "
-            for key, value in frequency.items():    # create report string
-                report += key + ": " + str(value) + "      "
-        self._lblReport.configure(text=report)
+        self.__startLoading(refresh=False)
+
+    def refreshData(self):
+        """Re-read only profiles which are new or changed since last load, then apply differences to table"""
+        if self._task is not None and self._task.running:   # still loading
+            return
+        if self._listNetwork is None:   # nothing to compare with
+            self.loadData()
+        else:
+            self.__startLoading(refresh=True)
+
+    def __startLoading(self, refresh, reuse=True):
+        """Start a BackgroundTask which reads profiles, reuse tells whether refreshing keeps unchanged profiles"""
+        self._refresh = refresh
+        self._loading = None
+        self._started = instrument.clock()  # whole loading, from click to last row
+        self._btnLoad.configure(state=DISABLED)
+        self._btnRefresh.configure(state=DISABLED)
+        self._btnCancel.configure(state=NORMAL)
+        self._lblReport.configure(text="Loading...")
+        previous = self._listNetwork if refresh and reuse else None
+        self._task = BackgroundTask(self._window, lambda cancelled: self.__produceProfiles(cancelled, previous, refresh),
+                                    self.__onProfile, self.__onProfilesDone).start()
+
+    def cancelLoading(self):
+        """Stop loading, profiles which are read already stay in table"""
+        if self._task is not None:
+            self._task.cancel()
+
+    def __produceProfiles(self, cancelled, previous, refresh):
+        """Worker thread: list SSIDs, then read profiles which previous does not have.
+
+        Refreshing ends with the index of all profiles, it is built here to keep Tk loop responsive."""
+        network = NetshWlan(load=False, previous=previous)
+        yield "list", network
+        with closing(network.iterLoad(cancelled=cancelled)) as results:    # closed with this generator by cancel
+            for result in results:
+                yield "profile", result
+        if refresh and not cancelled.is_set():
+            yield "index", ProfileIndex(network.listInfo)
+
+    def __onProfile(self, item):
+        """Tk loop: show progress and each profile which is read"""
+        kind, value = item
+        if kind == "index":     # refreshing is finished, applied with the rows at the end
+            self._loadingIndex = value
+            return
+        if kind == "list":  # SSIDs are known, profiles will come
+            self._loading = value
+            self._loadingIndex = None
+            self._done = 0
+            self._shown = 0
+            if not self._refresh:   # rows are clickable while loading
+                self._listNetwork = value
+        else:
+            ssid, record, error = value
+            if error is None and not self._refresh:     # refreshing applies all differences at the end
+                position = self._index.add(record)  # counts and filter follow each row
+                visible = not self.__filtering() or self._index.matches(position, self._txtFilter.get(), self.__kind())
+                self._tblInfo.append(record, key=ssid, visible=visible)   # table masks key when it is hidden
+                self._shown += 1
+            self._done += 1
+        self._lblReport.configure(text="Loading: " + str(self._done) + "/" + str(len(self._loading.listName)))
+
+    def __onProfilesDone(self, error, cancelled):
+        """Tk loop: loading finishes, is cancelled or fails"""
+        self._btnLoad.configure(state=NORMAL)
+        self._btnRefresh.configure(state=NORMAL)
+        self._btnCancel.configure(state=DISABLED)
+        instrument.finish("gui.wlan.refresh" if self._refresh else "gui.wlan.load", self._started)
+        if self._refresh:
+            if error is None and not cancelled and self._loadingIndex is not None:  # otherwise keep what is shown
+                self._listNetwork = self._loading
+                self._index = self._loadingIndex
+                self._tblInfo.sync(self._listNetwork.listInfo)
+                if self._tblInfo.item(self._tblInfo.focus())["values"] != "":   # focused row may be changed
+                    self._on_click(None)
+        elif self._listNetwork is not None:     # worker may read one more profile than shown before noticing cancel
+            del self._listNetwork.listInfo[self._shown:]
+        self.__updateKinds()
+        self.filterData()   # sync drops filter, and rows which arrive are not sorted
+        if error is None and not cancelled and len(self._listNetwork.failures) == 0:  # an incomplete inventory is not served later
+            saveSnapshot(self._store, WLAN, self._listNetwork.toData())
+
+        if error is not None:
+            showinfo("Infomation", "Cannot load profiles from system: " + str(error))
+        elif cancelled:
+            self._lblReport.configure(text="Cancelled. " + self.__report())
+        elif self._refresh:
+            self._lblReport.configure(text=self.__report() + "(reused " + str(self._listNetwork.reused) + ", read " + \
+                                      str(len(self._listNetwork.listName) - self._listNetwork.reused) + ")")
+        elif len(self._listNetwork.failures) == 0:
+            showinfo("Infomation", "Load all profiles from system successfully")
+        else:   # some profiles could not be read, tell which ones
+            showinfo("Infomation", "Load profiles from system with " + str(len(self._listNetwork.failures)) + " failure(s): " + \
+                     ", ".join(ssid for ssid, error in self._listNetwork.failures))
+
+    def __report(self):
+        """Summary of loaded profiles: total and frequency of each kind, counted as rows arrive"""
+        return self._index.summary()
 
     def exportData(self):
-        """Export wireless network information to csv file"""
-        fileTypes = [("CSV UTF-8 (Comma delimited)", "*.csv"),]
-        file = asksaveasfile(mode='w', filetypes=fileTypes, defaultextension=fileTypes)
-        
-        if file != None:    # solve exception: when press Export button and exit immediately (no Save)
-            with open(file.name, mode="w", newline="") as csv_file: # newline="" for not making new line after a record
-                fieldnames = ("ID", "SSID", "Kind", "Key")
-                writer = DictWriter(csv_file, fieldnames=fieldnames)
-                writer.writeheader()
-                for i in range(len(self._listNetwork.listInfo)):
-                    writer.writerow({fieldnames[0]: i + 1,
-                                    fieldnames[1]: self._listNetwork.listInfo[i][0],
-                                    fieldnames[2]: self._listNetwork.listInfo[i][1],
-                                    fieldnames[3]: self._listNetwork.listInfo[i][2]})
+        """Export wireless network information to csv, json lines or binary file, optionally gzip compressed"""
+        if self._listNetwork is None or len(self._listNetwork.listInfo) == 0:   # solve exception: nothing is loaded yet
+            showinfo("Infomation", "Nothing to export, load profiles from system first")
+            return
+        path = asksaveasfilename(filetypes=EXPORT_TYPES, defaultextension=".csv")
+        if path:    # solve exception: when press Export button and exit immediately (no Save)
+            exportRecords(profileRecords(self._listNetwork.listInfo), path, PROFILE_FIELDS)
+
     def clearData(self):
         """Clear all data in profile table"""
-        for item in self._tblInfo.get_children():
-            self._tblInfo.delete(item)
+        if self._task is not None and self._task.running:   # drop profiles which are still coming
+            self._task.cancel(discard=True)
+            self._btnLoad.configure(state=NORMAL)
+            self._btnRefresh.configure(state=NORMAL)
+            self._btnCancel.configure(state=DISABLED)
+        self._listNetwork = None
+        self._index = ProfileIndex()
+        self._tblInfo.clear()
+        self.__updateKinds()
 
         self._txtSsid.configure(state=NORMAL)
         self._txtSsid.delete(0, END)
@@ -244,8 +361,8 @@ class WirelessProfiles:
         self._lblReport.configure(text="Total: 0")       
 
 class NetworkInterfaceCards:
-    def __init__(self, parent):
-        """Contruct a list of network interface cards"""
+    def __init__(self, parent, store=None):
+        """Contruct a list of network interface cards, the latest snapshot of store is shown at once"""
         self._window = parent
 
         self._lblTitle = Label(self._window, text="NETWORK INTERFACE CARDS", font=10)
@@ -253,6 +370,9 @@ class NetworkInterfaceCards:
 
         self._lblName = Label(self._window, text="List of NICs")
         self._lblName.grid(row=1, column=0, sticky=NW, padx=(25, 0), pady=(10, 0))
+        self._txtFilter = Entry(self._window, width=25)    # name, label or value contains text, or Label=Value
+        self._txtFilter.grid(row=1, column=0, sticky=NE, pady=(10, 0))
+        self._txtFilter.bind("<KeyRelease>", lambda event: self.filterNics())
         self._lbName = Listbox(self._window, width=40)
         self._lbName.bind("<<ListboxSelect>>", self._on_select)
         self._lbName.grid(row=2, column=0, sticky=N, padx=(25, 0), pady=(5, 0))
@@ -270,50 +390,330 @@ class NetworkInterfaceCards:
         self._btnLoad.grid(row=3, column=0, sticky=NW, padx=(0, 5), pady=(10, 0))
         self._btnClear = Button(self._fButton, text="Clear all", width=18, command=lambda:[self.clearNics(), self.clearDetails()])
         self._btnClear.grid(row=3, column=1, sticky=NE, padx=(5, 0), pady=(10, 0))
+        self._btnCancel = Button(self._fButton, text="Cancel", width=18, state=DISABLED, command=self.cancelLoading)
+        self._btnCancel.grid(row=4, column=0, sticky=NW, padx=(0, 5), pady=(10, 0))
+        self._btnExport = Button(self._fButton, text="Export", width=18, command=self.exportNics)
+        self._btnExport.grid(row=4, column=1, sticky=NE, padx=(5, 0), pady=(10, 0))
+        self._btnMonitor = Button(self._fButton, text="Start monitor", width=18, command=self.toggleMonitor)
+        self._btnMonitor.grid(row=5, column=0, sticky=NW, padx=(0, 5), pady=(10, 0))
         
         self._lblInfo = Label(self._window, text="Information")
         self._lblInfo.grid(row=1, column=1, sticky=NW, padx=(15, 0), pady=(10, 0))
         self._tblInfo = Table(window=self._window, scrollbar=False, height=20)
         self._tblInfo.construct(["Properties", "Values"], [175, 250], idcolumn=False, anchor=NW)
+        self._tblInfo.enableSorting()
         self._tblInfo.grid(row=2, column=1, rowspan=10, sticky=N, padx=(15, 0), pady=(5, 0))
+        self._tblMonitor = Table(window=self._window, scrollbar=False, height=20)     # takes place of details while monitoring
+        self._tblMonitor.construct(["Adapter", "State", "Received", "Sent", "Errors/s"], [125, 50, 90, 90, 70], idcolumn=False)
+        self._tblMonitor.grid(row=2, column=1, rowspan=10, sticky=N, padx=(15, 0), pady=(5, 0))
+        self._tblMonitor.grid_remove()
+
+        self._networkInterfaceCards = None
+        self._nicNames = []     # names in listbox, mirror for diffing without Tcl calls
+        self._nicIndex = NicIndex()     # properties of loaded NICs
+        self._matches = None    # {name: matching detail rows or None for all} of filter, None when not filtering
+        self._task = None   # BackgroundTask which is loading NICs
+        self._monitorTask = None    # BackgroundTask which samples statistics, runs until it is stopped
+        self._store = store
+        if store is not None:
+            self.__showSnapshot()
+
+    def __showSnapshot(self):
+        """Show the latest snapshot, revalidate it in background when it is older than ttl"""
+        try:
+            snapshot = self._store.latest(NICS)
+        except StoreError:
+            return
+        if snapshot is None:
+            return
+        self._networkInterfaceCards = IpConfig.fromData(snapshot.data)
+        self._nicIndex = NicIndex(self._networkInterfaceCards.nics.values())
+        self._nicNames = list(self._networkInterfaceCards.nics)
+        for name in self._nicNames:
+            self._lbName.insert(END, name)
+        if self._networkInterfaceCards.host is not None:
+            self._lblHost.configure(text="Hostname: " + self._networkInterfaceCards.host.get("Host Name", "None"))
+        self._lblTotal.configure(text="Total: " + str(len(self._nicNames)) + " (" + snapshotTime(snapshot) + ")")
+        if self._networkInterfaceCards.current is not None:
+            self._lblCurrent.configure(text="Current use: " + self._networkInterfaceCards.current)
+        if snapshot.age > self._store.ttl:  # listbox is diffed, so only changes are visible
+            self.loadNics()
 
     def _on_select(self, event):
         """View details of each network interface card"""
-        try:
-            # get value (info) of current key (nics' name)
-            content = self._networkInterfaceCards.nics[event.widget.get(event.widget.curselection()[0])].split("\n")
-            datasource = []
-            for item in content:
-                currentField = item.split(" : ")
-                currentField[0] = currentField[0].replace(".", "")
-                datasource.append(currentField)
-            self.clearDetails() # clear table before filling
-            self._tblInfo.fill(datasource)
-        except Exception as e:
-            pass
+        selection = event.widget.curselection()
+        if len(selection) == 0:     # solve exception: listbox loses its selection
+            return
+        nic = self._networkInterfaceCards.nics.get(event.widget.get(selection[0]))
+        if nic is not None:
+            with instrument.stage("gui.nics.select"):
+                self.clearDetails() # clear table before filling
+                self._tblInfo.fill(nic.rows(), keys=nic.rowKeys())  # rows are parsed once when NICs are loaded
+                self.__filterDetails(nic.name)
+
+    def filterNics(self):
+        """Show only NICs whose name, property or value contains filter text, "Label=Value" matches a property"""
+        with instrument.stage("gui.nics.filter"):
+            text = self._txtFilter.get().strip()
+            self._matches = self._nicIndex.search(text) if text != "" else None
+            self.__showNames()
+
+    def __showNames(self):
+        """Fill listbox with loaded NICs which match filter, the selected NIC stays selected"""
+        names = list(self._networkInterfaceCards.nics) if self._networkInterfaceCards is not None else []
+        if self._matches is not None:
+            names = [name for name in names if name in self._matches]
+        selected = self.__selectedName()
+        if names != self._nicNames:
+            self._lbName.delete(0, END)
+            if len(names) != 0:
+                self._lbName.insert(END, *names)
+            self._nicNames = names
+            if selected in names:
+                self._lbName.selection_set(names.index(selected))
+                self._lbName.see(names.index(selected))
+        if selected in names:
+            self.__filterDetails(selected)
+        elif selected is not None:  # selected NIC is filtered out
+            self.clearDetails()
+        total = "Total: " + str(len(self._networkInterfaceCards.nics) if self._networkInterfaceCards is not None else 0)
+        self._lblTotal.configure(text=total if self._matches is None else total + " (shown " + str(len(names)) + ")")
+
+    def __selectedName(self):
+        """Name of NIC selected in listbox, None when there is no selection"""
+        selection = self._lbName.curselection()
+        return self._nicNames[selection[0]] if len(selection) != 0 else None
+
+    def __filterDetails(self, name):
+        """Show only detail rows of a NIC which match filter"""
+        self._tblInfo.view(self._matches.get(name) if self._matches is not None else None)
 
     def loadNics(self):
-        """Load list of network interface cards into listbox"""
-        self.clearNics()    # clear list before filling, because function here is INSERT
-        self._networkInterfaceCards = IpConfig()    # get a dictionary of nics
-
-        for key, value in self._networkInterfaceCards.nics.items():
-            if key != "Windows IP Configuration":   # leave out first field, because it is not a nic
-                self._lbName.insert(END, key)
-            if "Lease Obtained" in value:   # save for use later, as current nic which PC is using
-                current = key
-        self._lblHost.configure(text="Hostname: " + getoutput("hostname"))
-        self._lblTotal.configure(text="Total: " + str(len(self._networkInterfaceCards.nics) - 1))
-        self._lblCurrent.configure(text="Current use: " + current)
-    
+        """Load list of network interface cards into listbox in background, only differences touch listbox"""
+        if self._task is not None and self._task.running:   # still loading
+            return
+        self._networkInterfaceCards = IpConfig(load=False)  # get an index of nics by name, filled by worker
+        self._nicIndex = NicIndex()
+        self._arrived = 0   # NICs are placed at listbox positions in order of arriving
+        self._started = instrument.clock()
+
+        self._btnLoad.configure(state=DISABLED)
+        self._btnCancel.configure(state=NORMAL)
+        self._task = BackgroundTask(self._window, self.__produceNics, self.__onNic, self.__onNicsDone).start()
+
+    def cancelLoading(self):
+        """Stop loading, NICs which are read already stay in list"""
+        if self._task is not None:
+            self._task.cancel()
+
+    def __produceNics(self, cancelled):
+        """Worker thread: parse NICs one by one, then get hostname"""
+        for nic in self._networkInterfaceCards.iterLoad():
+            yield "nic", nic
+        yield "host", defaultRunner()("hostname")
+
+    def __onNic(self, item):
+        """Tk loop: show each NIC as soon as it is parsed"""
+        kind, value = item
+        if kind == "host":
+            self._lblHost.configure(text="Hostname: " + value)
+            return
+
+        self._nicIndex.add(value)
+        position = self._arrived
+        self._arrived += 1
+        if self._matches is not None:   # listbox only has matching NICs, search again and rebuild it
+            self._matches = self._nicIndex.search(self._txtFilter.get().strip())
+            self.__showNames()
+            if value.current:
+                self._lblCurrent.configure(text="Current use: " + value.name)
+            if self.__selectedName() == value.name:
+                self._tblInfo.sync(value.rows(), keys=value.rowKeys())
+                self.__filterDetails(value.name)
+            return
+        if position >= len(self._nicNames) or self._nicNames[position] != value.name:
+            if value.name in self._nicNames[position:]:     # NIC moves, drop its old entry
+                old = self._nicNames.index(value.name, position)
+                self._lbName.delete(old)
+                del self._nicNames[old]
+            self._lbName.insert(position, value.name)
+            self._nicNames.insert(position, value.name)
+        self._lblTotal.configure(text="Total: " + str(len(self._nicNames)))
+        if value.current:
+            self._lblCurrent.configure(text="Current use: " + value.name)
+
+        selection = self._lbName.curselection()
+        if len(selection) != 0 and self._nicNames[selection[0]] == value.name:   # details of selected NIC may be changed
+            self._tblInfo.sync(value.rows(), keys=value.rowKeys())
+            self.__filterDetails(value.name)
+
+    def __onNicsDone(self, error, cancelled):
+        """Tk loop: loading finishes, is cancelled or fails"""
+        self._btnLoad.configure(state=NORMAL)
+        self._btnCancel.configure(state=DISABLED)
+        instrument.finish("gui.nics.load", self._started)
+        if error is None and not cancelled and self._matches is None and len(self._nicNames) > self._arrived:     # NICs which disappear
+            self._lbName.delete(self._arrived, END)
+            del self._nicNames[self._arrived:]
+            if self._networkInterfaceCards.current is None:
+                self._lblCurrent.configure(text="Current use: None")
+        if self._matches is None:
+            self._lblTotal.configure(text="Total: " + str(len(self._nicNames)))
+        if error is not None:
+            showinfo("Infomation", "Cannot load NICs from system: " + str(error))
+        elif not cancelled:
+            saveSnapshot(self._store, NICS, self._networkInterfaceCards.toData())
+
+    def toggleMonitor(self):
+        """Start or stop sampling statistics of all adapters, rows are updated in place on every sample"""
+        if self._monitorTask is not None and self._monitorTask.running:
+            self._monitorTask.cancel(discard=True)
+            self.__onMonitorDone(None, True)
+            return
+        monitor = Monitor()     # ring buffers of a fixed size, memory stays flat however long it runs
+        self._lblInfo.configure(text="Statistics")
+        self._tblInfo.grid_remove()
+        self._tblMonitor.clear()
+        self._tblMonitor.grid()
+        self._btnMonitor.configure(text="Stop monitor")
+        self._monitorTask = BackgroundTask(self._window, monitor.run, self.__onSample, self.__onMonitorDone).start()
+
+    def __onSample(self, rows):
+        """Tk loop: apply a sample, only cells which change are touched"""
+        self._tblMonitor.sync(rows)
+        instrument.count("monitor.samples")
+
+    def __onMonitorDone(self, error, cancelled):
+        """Tk loop: monitoring stops, details come back"""
+        self._tblMonitor.grid_remove()
+        self._tblInfo.grid()
+        self._lblInfo.configure(text="Information")
+        self._btnMonitor.configure(text="Start monitor")
+        if error is not None:
+            showinfo("Infomation", "Cannot read statistics of NICs: " + str(error))
+
+    def exportNics(self):
+        """Export inventory of NICs, one record per property value"""
+        if self._networkInterfaceCards is None or len(self._networkInterfaceCards.nics) == 0:
+            showinfo("Infomation", "Nothing to export, load NICs first")
+            return
+        path = asksaveasfilename(filetypes=EXPORT_TYPES, defaultextension=".csv")
+        if path:
+            exportRecords(nicRecords(self._networkInterfaceCards.nics), path, NIC_FIELDS)
+
     def clearNics(self):
         """Clear the list of network inteface cards"""
+        if self._task is not None and self._task.running:   # drop NICs which are still coming
+            self._task.cancel(discard=True)
+            self._btnLoad.configure(state=NORMAL)
+            self._btnCancel.configure(state=DISABLED)
         self._lbName.delete(0, END)
+        self._nicNames = []
+        self._networkInterfaceCards = None
+        self._nicIndex = NicIndex()
+        if self._matches is not None:
+            self._matches = {}
+        self._lblHost.configure(text="Hostname: None")
+        self._lblTotal.configure(text="Total: 0")
+        self._lblCurrent.configure(text="Current: None")
         
     def clearDetails(self):
         """Clear all details of the current NICs"""
-        for item in self._tblInfo.get_children():
-            self._tblInfo.delete(item)
+        self._tblInfo.clear()
+
+class FleetWindow:
+    def __init__(self, parent, paths):
+        """Window of profiles and NICs merged from exports and snapshots of many hosts under paths"""
+        self._dialog = Toplevel(parent)
+        self._dialog.geometry("800x600")
+        self._dialog.title("Hosts")
+
+        self._lblTitle = Label(self._dialog, text="MERGED PROFILES", font=10)
+        self._lblTitle.grid(row=0, column=0, columnspan=2, padx=(10, 0), pady=(10, 0))
+
+        self._tblProfiles = Table(self._dialog, virtual=True)  # fleets have many profiles
+        self._tblProfiles.construct(["SSID", "Kind", "Key", "Hosts"], [150, 120, 120, 50])
+        self._tblProfiles.mask("4")
+        self._tblProfiles.showMasked(True)
+        self._tblProfiles.grid(row=1, column=0, padx=(25, 0), pady=(10, 0))
+        self._tblProfiles.bind("<<TreeviewSelect>>", self._on_click)
+
+        self._fRight = Frame(self._dialog)
+        self._fRight.grid(row=1, column=1, sticky=NW, padx=(10, 10), pady=(10, 0))
+        self._checked = IntVar()
+        self._chkbtnShow = Checkbutton(self._fRight, text="Show password", variable=self._checked,
+                                       command=lambda: self._tblProfiles.showMasked(not self._checked.get()))
+        self._chkbtnShow.grid(row=0, column=0, sticky=NW)
+        self._cbQuery = Combobox(self._fRight, values=FLEET_QUERIES, state="readonly", width=30)
+        self._cbQuery.current(0)
+        self._cbQuery.grid(row=1, column=0, sticky=NW, pady=(7, 0))
+        self._txtQuery = Entry(self._fRight, width=33)
+        self._txtQuery.grid(row=2, column=0, sticky=NW, pady=(7, 0))
+        self._txtQuery.bind("<Return>", lambda event: self.find())
+        self._btnFind = Button(self._fRight, text="Find", width=30, command=self.find)
+        self._btnFind.grid(row=3, column=0, sticky=NW, pady=(7, 0))
+        self._tblResult = Table(self._fRight, height=12)
+        self._tblResult.construct(["Host", "Adapter"], [100, 110])
+        self._tblResult.grid(row=4, column=0, sticky=NW, pady=(7, 0))
+
+        self._lblReport = Label(self._dialog, text="Loading...")
+        self._lblReport.grid(row=2, column=0, columnspan=2, sticky=NW, padx=(25, 0), pady=(10, 10))
+
+        self._fleet = None
+        self._task = BackgroundTask(self._dialog, lambda cancelled: [aggregate(paths, cancelled=cancelled)],
+                                    self.__onFleet, self.__onDone).start()
+        self._dialog.protocol("WM_DELETE_WINDOW", self.close)
+
+    def __onFleet(self, fleet):
+        """Tk loop: show merged profiles and summary counts"""
+        self._fleet = fleet
+        for record in fleet.records():
+            self._tblProfiles.append(record, key=(record[0], record[1]))
+        report = "Hosts: " + str(len(fleet.hosts)) + "      " + ProfileIndex(fleet.records()).summary()
+        if len(fleet.failures) != 0:
+            report += "Unreadable files: " + str(len(fleet.failures))
+        self._lblReport.configure(text=report)
+
+    def __onDone(self, error, cancelled):
+        """Tk loop: reading finishes"""
+        if error is not None:
+            self._lblReport.configure(text="Cannot read inventories: " + str(error))
+
+    def _on_click(self, event):
+        """Hosts storing the focused profile"""
+        currentRecord = self._tblProfiles.item(self._tblProfiles.focus(), "values")
+        if currentRecord != "":     # solve exception: click on header line
+            self.__showResult([(host, "") for host in self._fleet.hostsWithSsid(str(currentRecord[1]), str(currentRecord[2]))])
+
+    def find(self):
+        """Answer the chosen query by indexes of the fleet"""
+        if self._fleet is None:     # still loading
+            return
+        query = self._cbQuery.get()
+        text = self._txtQuery.get().strip()
+        if query == FLEET_QUERIES[0]:
+            result = [(host, "") for host in self._fleet.hostsWithSsid(text)]
+        elif query == FLEET_QUERIES[1]:
+            result = self._fleet.adapterOf(text)
+        elif query == FLEET_QUERIES[2]:
+            result = self._fleet.adaptersWhere("DHCP Enabled", "No")
+        else:
+            label, separator, value = text.partition("=")
+            if not separator:
+                showinfo("Infomation", "Write the query as Property=Value, e.g. Media State=Media disconnected")
+                return
+            result = self._fleet.adaptersWhere(label.strip(), value.strip())
+        self.__showResult(result)
+
+    def __showResult(self, result):
+        """Fill result table with (host, adapter) pairs"""
+        self._tblResult.clear()
+        self._tblResult.fill([[host, adapter] for host, adapter in result])
+
+    def close(self):
+        """Stop reading and close window"""
+        self._task.cancel(discard=True)
+        self._dialog.destroy()
 
 class About:
     def __init__(self, parent):
@@ -334,8 +734,8 @@ class About:
         self._dialog.mainloop()
 
 class MainApp:
-    def __init__(self):
-        """Create main app"""
+    def __init__(self, profilePath=None):
+        """Create main app, profilePath is where cProfile stats of the window are written (NETINFO_PROFILE when None)"""
         self._window = Tk()
         self._window.geometry("800x600")
         self._window.title("Your network")
@@ -345,11 +745,15 @@ class MainApp:
 
         self._fileMenu = Menu(self._menubar, tearoff=0)
         self._menubar.add_cascade(label="File", menu=self._fileMenu)
+        self._fileMenu.add_command(label="Aggregate hosts...", command=self.aggregateHosts)
         self._fileMenu.add_command(label="Exit", command=self._window.destroy)
 
         self._infoMenu = Menu(self._menubar, tearoff=0)
         self._menubar.add_cascade(label="Information", menu=self._infoMenu)
         self._infoMenu.add_command(label="About", command=self.getAbout)
+        self._instrumented = BooleanVar(value=instrument.ENABLED)
+        self._infoMenu.add_checkbutton(label="Instrumentation", variable=self._instrumented, command=self.toggleInstrumentation)
+        self._infoMenu.add_command(label="Save instrumentation report...", command=self.dumpInstrumentation)
 
         self._window.configure(menu=self._menubar)  # add menubar to window
 
@@ -362,10 +766,51 @@ class MainApp:
         self._tabControl.add(self._tabWifi, text="Wifi")
         self._tabControl.add(self._tabNics, text="NICs")
 
-        self._wirelessProfiles = WirelessProfiles(self._tabWifi)
-        self._networkInterfaceCards = NetworkInterfaceCards(self._tabNics)
-
-        self._window.mainloop()
+        try:
+            self._store = SnapshotStore()   # last inventories are shown at start, before any command finishes
+        except (StoreError, OSError):   # e.g. home directory is read-only, run without snapshots
+            self._store = None
+        self._wirelessProfiles = WirelessProfiles(self._tabWifi, self._store)
+        self._networkInterfaceCards = NetworkInterfaceCards(self._tabNics, self._store)
+
+        self._lblStatus = Label(self._window, text="", anchor=W)    # instrumentation overlay, hidden when it is off
+        self._lblStatus.grid(row=1, column=0, sticky=EW, padx=(30, 0), pady=(5, 0))
+        self._lblStatus.grid_remove()
+        self._statusJob = None  # pending after() of status bar
+        if instrument.ENABLED:
+            self.toggleInstrumentation()
+
+        with instrument.profiling(profilePath or instrument.PROFILE_PATH):  # the only profiler of the window
+            self._window.mainloop()
+
+    def toggleInstrumentation(self):
+        """Switch instrumentation and its status bar"""
+        instrument.enable(self._instrumented.get())
+        if self._statusJob is not None:
+            self._window.after_cancel(self._statusJob)
+            self._statusJob = None
+        if instrument.ENABLED:
+            self._lblStatus.grid()
+            self.__updateStatus()
+        else:
+            self._lblStatus.grid_remove()
+
+    def __updateStatus(self):
+        """Refresh status bar while instrumentation is on"""
+        self._lblStatus.configure(text=instrument.statusLine())
+        self._statusJob = self._window.after(STATUS_INTERVAL, self.__updateStatus)
+
+    def dumpInstrumentation(self):
+        """Save instrumentation report as JSON"""
+        path = asksaveasfilename(filetypes=[("JSON", "*.json")], defaultextension=".json")
+        if path:
+            instrument.dump(path)
     
+    def aggregateHosts(self):
+        """Merge exports and snapshots of many hosts which are collected in a folder"""
+        path = askdirectory(title="Folder of exports and snapshots")
+        if path:
+            FleetWindow(self._window, [path])
+
     def getAbout(self):
         authorInformation = About(self._window)
\ No newline at end of file
@@ -0,0 +1,205 @@
+import os
+import time
+from array import array
+from runner import defaultRunner, LiveRunner
+
+COUNTERS = ("rxBytes", "txBytes", "rxPackets", "txPackets", "rxErrors", "txErrors", "rxDrops", "txDrops")
+RX_BYTES, TX_BYTES, RX_PACKETS, TX_PACKETS, RX_ERRORS, TX_ERRORS, RX_DROPS, TX_DROPS = range(len(COUNTERS))
+WIDTH = len(COUNTERS)
+CAPACITY = 300          # intervals kept per adapter, 10 minutes at the default interval
+INTERVAL = 2.0          # seconds between two samples
+PROC_NET_DEV = "/proc/net/dev"
+SYS_CLASS_NET = "/sys/class/net"
+TOTALS = "All adapters"     # pseudo adapter of netstat -e, Windows counts packets and errors only in total
+MEDIA_STATES = {"1": "up", "5": "down"}     # MediaSenseState of netsh
+
+class StatsSource:
+    def sample(self):
+        """Current counters of every adapter: {name: (state, counters)}, counters has one number per COUNTERS"""
+        raise NotImplementedError
+
+class ProcNetDev(StatsSource):
+    def __init__(self, path=PROC_NET_DEV, sysfs=SYS_CLASS_NET):
+        """Counters of Linux, read straight from procfs without starting a process"""
+        self.path = path
+        self.sysfs = sysfs
+
+    def sample(self):
+        """Parse /proc/net/dev, state is operstate of sysfs"""
+        result = {}
+        with open(self.path, encoding="ascii") as file:
+            for line in file:
+                name, separator, numbers = line.partition(":")
+                if separator == "" or "|" in line:  # two header lines
+                    continue
+                name = name.strip()
+                numbers = numbers.split()
+                counters = (int(numbers[0]), int(numbers[8]), int(numbers[1]), int(numbers[9]),
+                            int(numbers[2]), int(numbers[10]), int(numbers[3]), int(numbers[11]))
+                result[name] = (self.__state(name), counters)
+        return result
+
+    def __state(self, name):
+        """operstate of an interface, "unknown" when sysfs does not tell"""
+        try:
+            with open(os.path.join(self.sysfs, name, "operstate"), encoding="ascii") as file:
+                return file.read().strip()
+        except OSError:
+            return "unknown"
+
+class NetshSubinterfaces(StatsSource):
+    def __init__(self, runner=None, totals=True):
+        """Counters of Windows: bytes per adapter from netsh, packets, errors and discards of all adapters from netstat -e"""
+        self._runner = runner if runner is not None else defaultRunner()
+        self.totals = totals
+
+    def sample(self):
+        """Parse both commands, totals appear as adapter TOTALS"""
+        result = {}
+        for line in self._runner("netsh interface ipv4 show subinterfaces").splitlines():
+            fields = line.split(None, 4)    # MTU, MediaSenseState, Bytes In, Bytes Out, Interface
+            if len(fields) == 5 and fields[0].isdigit():    # skip header and separator
+                counters = (int(fields[2]), int(fields[3]), 0, 0, 0, 0, 0, 0)
+                result[fields[4]] = (MEDIA_STATES.get(fields[1], fields[1]), counters)
+        if self.totals:
+            result[TOTALS] = ("up", self.__totals())
+        return result
+
+    def __totals(self):
+        """Counters of netstat -e, received and sent columns"""
+        table = {}
+        for line in self._runner("netstat -e").splitlines():
+            words = line.split()
+            if len(words) >= 3 and words[-1].isdigit() and words[-2].isdigit():
+                table[" ".join(words[:-2])] = (int(words[-2]), int(words[-1]))
+        octets = table.get("Bytes", (0, 0))
+        unicast = table.get("Unicast packets", (0, 0))
+        other = table.get("Non-unicast packets", (0, 0))
+        errors = table.get("Errors", (0, 0))
+        discards = table.get("Discards", (0, 0))
+        return (octets[0], octets[1], unicast[0] + other[0], unicast[1] + other[1], errors[0], errors[1], discards[0], discards[1])
+
+def defaultSource(runner=None):
+    """procfs on Linux, netsh on Windows and when commands are replayed"""
+    runner = runner if runner is not None else defaultRunner()
+    if isinstance(runner, LiveRunner) and os.path.isfile(PROC_NET_DEV):
+        return ProcNetDev()
+    return NetshSubinterfaces(runner)
+
+class AdapterStats:
+    __slots__ = ("name", "state", "capacity", "count", "seen", "rates",
+                 "_next", "_deltas", "_intervals", "_sums", "_elapsed", "_last", "_lastTime")
+
+    def __init__(self, name, capacity=CAPACITY):
+        """Samples of one adapter in ring buffers of fixed size, memory does not grow however long it runs.
+
+        Each slot keeps the counter deltas and the length of one interval, rates of the last interval and
+        running sums over the whole window are updated incrementally as samples come."""
+        self.name = name
+        self.state = "unknown"
+        self.capacity = capacity
+        self.count = 0          # filled slots
+        self.seen = 0           # tick of the latest sample
+        self.rates = array("d", bytes(8 * WIDTH))    # per second, last interval
+        self._next = 0          # slot which is written next, the oldest one when buffer is full
+        self._deltas = array("d", bytes(8 * WIDTH * capacity))
+        self._intervals = array("d", bytes(8 * capacity))
+        self._sums = array("d", bytes(8 * WIDTH))     # sums of deltas in buffer
+        self._elapsed = 0.0     # sum of intervals in buffer
+        self._last = array("d", bytes(8 * WIDTH))
+        self._lastTime = None
+
+    def add(self, now, state, counters):
+        """Add a sample taken at now (monotonic seconds)"""
+        self.state = state
+        if self._lastTime is None:  # first sample, nothing to compare with
+            self._last = array("d", counters)
+            self._lastTime = now
+            return
+        interval = now - self._lastTime
+        if interval <= 0:
+            return
+        slot = self._next
+        base = slot * WIDTH
+        if self.count == self.capacity:     # slot of the oldest interval is reused, it leaves running sums
+            self._elapsed -= self._intervals[slot]
+            for i in range(WIDTH):
+                self._sums[i] -= self._deltas[base + i]
+        else:
+            self.count += 1
+        for i in range(WIDTH):
+            delta = counters[i] - self._last[i]
+            if delta < 0:   # counter is reset or wraps, e.g. adapter is re-enabled, count from here
+                delta = 0
+            self._deltas[base + i] = delta
+            self._sums[i] += delta
+            self._last[i] = counters[i]
+            self.rates[i] = delta / interval
+        self._intervals[slot] = interval
+        self._elapsed += interval
+        self._lastTime = now
+        self._next = (slot + 1) % self.capacity
+        if self._next == 0:     # once per round, recompute sums so float errors do not pile up over days
+            self._elapsed = sum(self._intervals[:self.count])
+            for i in range(WIDTH):
+                self._sums[i] = sum(self._deltas[i::WIDTH])
+
+    def average(self, counter):
+        """Rate per second of a counter over the whole buffered window"""
+        return self._sums[counter] / self._elapsed if self._elapsed > 0 else 0.0
+
+    def history(self, counter):
+        """Rates per second of a counter of buffered intervals, oldest first"""
+        start = self._next if self.count == self.capacity else 0
+        slots = [(start + i) % self.capacity for i in range(self.count)]
+        return [self._deltas[slot * WIDTH + counter] / self._intervals[slot] for slot in slots]
+
+    def __repr__(self):
+        return "AdapterStats(%r)" % self.name
+
+class Monitor:
+    def __init__(self, source=None, capacity=CAPACITY):
+        """Sample a StatsSource repeatedly, keep AdapterStats of every adapter"""
+        self.source = source if source is not None else defaultSource()
+        self.capacity = capacity
+        self.adapters = {}  # name -> AdapterStats, in order of appearing
+        self.ticks = 0
+
+    def tick(self, now=None):
+        """Take one sample of all adapters"""
+        samples = self.source.sample()
+        now = time.monotonic() if now is None else now
+        self.ticks += 1
+        for name, (state, counters) in samples.items():
+            stats = self.adapters.get(name)
+            if stats is None:
+                stats = self.adapters[name] = AdapterStats(name, self.capacity)
+            stats.add(now, state, counters)
+            stats.seen = self.ticks
+        # adapters which are gone for a whole window are forgotten, USB adapters coming and going do not grow memory
+        for name in [name for name, stats in self.adapters.items() if self.ticks - stats.seen > self.capacity]:
+            del self.adapters[name]
+
+    def rows(self):
+        """[adapter, state, received/s, sent/s, errors/s] of adapters present in the latest sample"""
+        rows = []
+        for stats in self.adapters.values():
+            if stats.seen == self.ticks:
+                rows.append([stats.name, stats.state, formatRate(stats.rates[RX_BYTES]), formatRate(stats.rates[TX_BYTES]),
+                             "%.2f" % (stats.rates[RX_ERRORS] + stats.rates[TX_ERRORS])])
+        return rows
+
+    def run(self, cancelled, interval=INTERVAL):
+        """Generator for BackgroundTask: sample every interval and yield rows until cancelled"""
+        while not cancelled.is_set():
+            self.tick()
+            yield self.rows()
+            cancelled.wait(interval)
+
+def formatRate(rate):
+    """Human readable bytes per second"""
+    for unit in ("B/s", "KB/s", "MB/s"):
+        if rate < 1024:
+            return "%.1f %s" % (rate, unit)
+        rate /= 1024
+    return "%.1f GB/s" % rate
@@ -0,0 +1,183 @@
+ALL_USER = "All User Profile"
+CURRENT_USER = "Current User Profile"
+GROUP_POLICY = "Group Policy Profile"
+PROFILE_KEYS = (ALL_USER, CURRENT_USER, GROUP_POLICY)
+
+class Profile:
+    __slots__ = ("name", "scope", "interface")
+
+    def __init__(self, name, scope, interface=""):
+        """A profile entry of `netsh wlan show profiles`"""
+        self.name = name
+        self.scope = scope          # one of PROFILE_KEYS
+        self.interface = interface  # name of wireless interface which owns the profile
+
+    def __repr__(self):
+        return "Profile(%r, %r, %r)" % (self.name, self.scope, self.interface)
+
+def _isRule(text):
+    """Whether a line only underlines a section header ("-----" or "=====")"""
+    return text != "" and text.strip("-=") == ""
+
+def iterKeyValues(lines):
+    """Walk netsh output once, yield (section, key, value). Lines without " : " have key None.
+
+    lines may be any iterable of strings, e.g. a list or stdout pipe of a process."""
+    section = ""
+    pending = None  # bare line which may be a section header, known when the next line comes
+    for line in lines:
+        line = line.rstrip("\r\n")
+        text = line.strip()
+        if text == "":
+            continue
+        if _isRule(text):
+            if pending is not None:     # the bare line before underline is a section header
+                section = pending
+                pending = None
+            continue
+        if pending is not None:
+            yield section, None, pending
+            pending = None
+
+        colon = line.find(" : ")
+        if colon != -1:
+            yield section, line[:colon].strip(), line[colon + 3:]
+        elif text.endswith(" :"):     # key without value, e.g. "Control options        :"
+            yield section, text[:-2].strip(), ""
+        else:
+            pending = text
+    if pending is not None:
+        yield section, None, pending
+
+def parseProfiles(lines):
+    """Yield Profile of every entry in `netsh wlan show profiles` output"""
+    interface = ""
+    for section, key, value in iterKeyValues(lines):
+        if key is None:
+            if value.startswith("Profiles on interface "):
+                interface = value[len("Profiles on interface "):].rstrip(":")
+            elif section.lower().startswith("group policy") and value != "<None>":
+                yield Profile(value, GROUP_POLICY, interface)   # group policy entries may be listed bare
+        elif key in PROFILE_KEYS:
+            yield Profile(value, key, interface)
+
+def parseProfileInfo(lines):
+    """Collect fields of `netsh wlan show profiles name = "..." key = clear` output into a dict.
+
+    Only the first occurrence of a key is kept, because netsh repeats Authentication and
+    Cipher for each supported authentication pair."""
+    info = {}
+    for section, key, value in iterKeyValues(lines):
+        if key is not None and key not in info:
+            info[key] = value
+    return info
+
+HOST_SECTION = "Windows IP Configuration"
+MULTI_VALUED = ("IPv4 Address", "IPv6 Address", "Temporary IPv6 Address", "Link-local IPv6 Address",
+                "Default Gateway", "DNS Servers", "DNS Suffix Search List", "Primary WINS Server",
+                "Secondary WINS Server")
+
+class Nic:
+    __slots__ = ("name", "fields", "_rows")
+
+    def __init__(self, name):
+        """A section of `ipconfig /all` output, fields maps label to a string or a list for multi-valued labels"""
+        self.name = name
+        self.fields = {}
+        self._rows = None
+
+    @classmethod
+    def fromFields(cls, name, fields):
+        """Rebuild a Nic from its fields, e.g. of a snapshot"""
+        nic = cls(name)
+        for label, value in fields.items():
+            nic.fields[label] = list(value) if isinstance(value, list) else value
+        return nic
+
+    def add(self, label, value):
+        """Add a value of a label, repeated or multi-valued labels are kept as lists"""
+        self._rows = None
+        current = self.fields.get(label)
+        if current is None:
+            self.fields[label] = [value] if label in MULTI_VALUED else value
+        elif isinstance(current, list):
+            current.append(value)
+        else:
+            self.fields[label] = [current, value]
+
+    def get(self, label, default=None):
+        """Value of a label"""
+        return self.fields.get(label, default)
+
+    def values(self, label):
+        """Values of a label as a list, empty when the label is missing or blank"""
+        value = self.fields.get(label)
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return [item for item in value if item != ""]
+        return [value] if value != "" else []
+
+    @property
+    def current(self):
+        """Whether PC is using this NIC, only an adapter in use has a DHCP lease"""
+        return "Lease Obtained" in self.fields
+
+    def rows(self):
+        """[property, value] rows for displaying, a multi-valued label takes one row per value"""
+        if self._rows is None:
+            self._rows = []
+            for label, value in self.fields.items():
+                if isinstance(value, list):
+                    items = [item for item in value if item != ""] or [""]     # blank label may be continued by values
+                    for i, item in enumerate(items):
+                        self._rows.append([label if i == 0 else "", item])
+                else:
+                    self._rows.append([label, value])
+        return self._rows
+
+    def rowKeys(self):
+        """Keys of rows(): (label, value, occurrence), unique even when a value repeats under a label
+        or continuation rows of two labels look the same, e.g. a router which is also DNS server"""
+        keys = []
+        seen = {}
+        label = ""
+        for name, value in self.rows():
+            label = name or label
+            occurrence = seen.get((label, value), 0)
+            seen[(label, value)] = occurrence + 1
+            keys.append((label, value, occurrence))
+        return keys
+
+    def __repr__(self):
+        return "Nic(%r)" % self.name
+
+def parseIpConfig(lines):
+    """Yield Nic of every section in `ipconfig /all` output, the first one is HOST_SECTION"""
+    nic = None
+    label = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        text = line.strip()
+        if text == "":
+            continue
+        if not line[0].isspace():   # section header, e.g. "Ethernet adapter Ethernet:"
+            if nic is not None:
+                yield nic
+            nic = Nic(text[:-1] if text.endswith(":") else text)
+            label = None
+            continue
+        if nic is None:
+            continue
+
+        head, separator, value = line.partition(" : ")
+        if separator:
+            label = head.strip().rstrip(". ")
+            nic.add(label, value.strip())
+        elif text.endswith(":") and " ." in text:  # label without value, e.g. "Primary Dns Suffix  . . . :"
+            label = text[:-1].strip().rstrip(". ")
+            nic.add(label, "")
+        elif label is not None:     # continuation of a multi-valued label
+            nic.add(label, text)
+    if nic is not None:
+        yield nic
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+from threading import Lock, Thread
+import instrument
+
+MAX_BYTES = 4 * 1024 * 1024     # memory bound of rendered XBM strings
+MAX_IMAGES = 32                 # Tk images kept alive, they are cheap to rebuild from XBM
+SCALE = 4
+
+def wifiPayload(ssid, kind, key):
+    """Payload of a Wi-Fi QR code, WIFI:S:<ssid>;T:<type>;P:<key>;; which phone cameras understand"""
+    if key == "None" or key == "":  # netsh has no key content, the network is open
+        return "WIFI:S:" + _escape(ssid) + ";T:nopass;;"
+    if kind.startswith("WPA"):
+        security = "WPA"    # WPA-Personal, WPA2-Personal, WPA3-Personal...
+    elif kind in ("Open", "Shared"):
+        security = "WEP"    # netsh shows WEP networks as open or shared authentication with a key
+    else:
+        security = "WPA"
+    return "WIFI:S:" + _escape(ssid) + ";T:" + security + ";P:" + _escape(key) + ";;"
+
+def _escape(text):
+    """Escape special characters of Wi-Fi payload fields"""
+    for character in "\\;,:\"":
+        text = text.replace(character, "\\" + character)
+    return text
+
+class QrCache:
+    def __init__(self, maxBytes=MAX_BYTES, scale=SCALE):
+        """LRU cache of QR codes: XBM strings bounded by maxBytes, Tk images bounded by MAX_IMAGES"""
+        self.maxBytes = maxBytes
+        self.scale = scale
+        self._xbm = OrderedDict()       # payload -> XBM string, least recently used first
+        self._size = 0                  # total length of cached XBM strings
+        self._images = OrderedDict()    # payload -> BitmapImage, touched by Tk thread only
+        self._wanted = []               # payloads waiting to be prewarmed
+        self._worker = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def xbm(self, payload):
+        """XBM string of a payload, rendered once, safe to call from any thread"""
+        with self._lock:
+            if payload in self._xbm:
+                self._xbm.move_to_end(payload)
+                self.hits += 1
+                return self._xbm[payload]
+            self.misses += 1
+
+        import pyqrcode     # imported when a QR code is needed the first time
+        with instrument.stage("qr.render"):
+            code = pyqrcode.create(payload).xbm(scale=self.scale)   # render outside lock, it is the slow part
+
+        with self._lock:
+            if payload not in self._xbm:
+                self._xbm[payload] = code
+                self._size += len(code)
+                while self._size > self.maxBytes and len(self._xbm) > 1:    # evict least recently used
+                    evicted, evictedCode = self._xbm.popitem(last=False)
+                    self._size -= len(evictedCode)
+        return code
+
+    def image(self, payload):
+        """BitmapImage of a payload, must be called from Tk thread"""
+        from tkinter import BitmapImage
+        if payload in self._images:
+            self._images.move_to_end(payload)
+            return self._images[payload]
+        image = BitmapImage(data=self.xbm(payload))
+        image.config(foreground="black", background="white")
+        self._images[payload] = image
+        while len(self._images) > MAX_IMAGES:
+            self._images.popitem(last=False)
+        return image
+
+    def prewarm(self, payloads):
+        """Render payloads in a background thread, replaces payloads which are still waiting"""
+        with self._lock:
+            self._wanted = [payload for payload in payloads if payload not in self._xbm]
+            if len(self._wanted) != 0 and self._worker is None:
+                self._worker = Thread(target=self.__prewarm, daemon=True)
+                self._worker.start()
+
+    def __prewarm(self):
+        """Body of prewarming thread, stops when nothing is wanted"""
+        while True:
+            with self._lock:
+                if len(self._wanted) == 0:
+                    self._worker = None
+                    return
+                payload = self._wanted.pop(0)
+            try:
+                self.xbm(payload)
+            except Exception:   # e.g. payload is too long for a QR code, rendering on click reports it
+                pass
+
+    def clear(self):
+        """Drop all cached codes"""
+        with self._lock:
+            self._xbm.clear()
+            self._size = 0
+            self._wanted = []
+        self._images.clear()
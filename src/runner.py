@@ -0,0 +1,134 @@
+import os
+import re
+import time
+from hashlib import sha1
+from subprocess import getoutput, Popen, PIPE, STDOUT
+from threading import Lock
+
+class CommandRunner:
+    def __init__(self):
+        """Base of all command runners, keep timing and byte counts of every command"""
+        self.stats = {}     # command -> [number of calls, total seconds, total bytes (characters when streamed)]
+        self._lock = Lock() # runners are shared by worker threads
+
+    def __call__(self, command):
+        """Run a command and return its output as a string"""
+        start = time.perf_counter()
+        output = self._run(command)
+        self._record(command, time.perf_counter() - start, len(output.encode("utf-8", "replace")))
+        return output
+
+    def stream(self, command):
+        """Run a command and yield its output line by line, time is counted until the output is consumed"""
+        start = time.perf_counter()
+        size = 0
+        try:
+            for line in self._stream(command):
+                size += len(line)
+                yield line
+        finally:
+            self._record(command, time.perf_counter() - start, size)
+
+    def _record(self, command, elapsed, size):
+        """Add a finished command to stats"""
+        with self._lock:
+            record = self.stats.setdefault(command, [0, 0.0, 0])
+            record[0] += 1
+            record[1] += elapsed
+            record[2] += size
+
+    def _run(self, command):
+        """Produce output of a command, must be overridden"""
+        raise NotImplementedError
+
+    def _stream(self, command):
+        """Produce output of a command as lines, override when the output can be read incrementally"""
+        return self._run(command).splitlines(True)
+
+    def summary(self):
+        """Group stats by program name (first word of command): {program: [calls, seconds, bytes]}"""
+        result = {}
+        with self._lock:
+            for command, (calls, seconds, size) in self.stats.items():
+                record = result.setdefault(command.split(" ", 1)[0], [0, 0.0, 0])
+                record[0] += calls
+                record[1] += seconds
+                record[2] += size
+        return result
+
+    def report(self):
+        """Human readable summary of all commands run so far"""
+        lines = []
+        for program, (calls, seconds, size) in sorted(self.summary().items()):
+            lines.append("%-10s calls: %-6d time: %.3fs  bytes: %d" % (program, calls, seconds, size))
+        return "\n".join(lines)
+
+    def reset(self):
+        """Forget all stats"""
+        with self._lock:
+            self.stats.clear()
+
+class LiveRunner(CommandRunner):
+    def _run(self, command):
+        """Run a command in the system shell"""
+        return getoutput(command)
+
+    def _stream(self, command):
+        """Read lines straight from stdout pipe of the command"""
+        process = Popen(command, shell=True, stdout=PIPE, stderr=STDOUT, text=True)
+        try:
+            yield from process.stdout
+        finally:
+            process.stdout.close()
+            process.wait()
+
+class ReplayRunner(CommandRunner):
+    def __init__(self, directory):
+        """Serve outputs which were captured into a fixture directory before"""
+        CommandRunner.__init__(self)
+        self.directory = directory
+
+    def _run(self, command):
+        """Read output of a command from its fixture file"""
+        path = os.path.join(self.directory, fixtureName(command))
+        if not os.path.isfile(path):
+            raise LookupError("No recorded output for command: " + command)
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+class RecordingRunner(CommandRunner):
+    def __init__(self, directory, runner=None):
+        """Run commands by another runner and capture outputs into a fixture directory"""
+        CommandRunner.__init__(self)
+        self.directory = directory
+        self._runner = runner if runner is not None else LiveRunner()
+        os.makedirs(directory, exist_ok=True)
+
+    def _run(self, command):
+        """Run a command and save its output for replaying later"""
+        output = self._runner(command)
+        with open(os.path.join(self.directory, fixtureName(command)), mode="w", encoding="utf-8") as file:
+            file.write(output)
+        return output
+
+def fixtureName(command):
+    """Name of the fixture file which stores output of a command"""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", command).strip("_")[:80]
+    return slug + "-" + sha1(command.encode("utf-8")).hexdigest()[:8] + ".txt"
+
+_defaultRunner = None
+
+def defaultRunner():
+    """Runner used by collectors when none is given, NETINFO_REPLAY=<directory> selects replaying"""
+    global _defaultRunner
+    if _defaultRunner is None:
+        if os.environ.get("NETINFO_REPLAY"):
+            _defaultRunner = ReplayRunner(os.environ["NETINFO_REPLAY"])
+        else:
+            _defaultRunner = LiveRunner()
+    return _defaultRunner
+
+def setDefaultRunner(runner):
+    """Replace runner used by collectors when none is given"""
+    global _defaultRunner
+    _defaultRunner = runner
@@ -0,0 +1,181 @@
+"""Indexes for filtering loaded profiles and NICs keystroke by keystroke.
+
+TextIndex keeps posting lists of every 1 to 3 character gram of its texts, so a substring query
+only verifies the rows of its rarest gram instead of scanning all of them, and a sorted copy for
+prefix queries. ProfileIndex adds buckets by kind and summary counts which are updated as profiles
+arrive; NicIndex maps NIC properties to the adapters and detail rows which have them.
+
+Positions are the order in which texts are added, like the rows of a Table filled with them."""
+from array import array
+from bisect import bisect_left
+
+GRAM = 3    # longest gram which is indexed
+PREFIX = "^"    # a query starting with it matches the beginning of texts only
+
+def _grams(text):
+    """Distinct grams of 1 to GRAM characters of a text"""
+    grams = set()
+    for size in range(1, GRAM + 1):
+        for i in range(len(text) - size + 1):
+            grams.add(text[i:i + size])
+    return grams
+
+class TextIndex:
+    def __init__(self):
+        """Substring and prefix index of texts, case is ignored"""
+        self._texts = []        # position -> casefolded text
+        self._postings = {}     # gram -> array of positions in increasing order
+        self._sorted = None     # [(text, position)] for prefix queries, built when asked for
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, text):
+        """Index a text, return its position"""
+        text = str(text).casefold()
+        position = len(self._texts)
+        self._texts.append(text)
+        for gram in _grams(text):
+            posting = self._postings.get(gram)
+            if posting is None:
+                posting = self._postings[gram] = array("I")
+            posting.append(position)
+        self._sorted = None
+        return position
+
+    def search(self, query):
+        """Positions of texts containing query in increasing order, all positions for an empty query"""
+        query = str(query).casefold()
+        if query.startswith(PREFIX):
+            return self.prefix(query[len(PREFIX):])
+        if query == "":
+            return range(len(self._texts))
+        if len(query) <= GRAM:  # the gram itself, nothing to verify
+            return self._postings.get(query, ())
+        rarest = None
+        for i in range(len(query) - GRAM + 1):
+            posting = self._postings.get(query[i:i + GRAM])
+            if posting is None:     # a gram which no text has
+                return ()
+            if rarest is None or len(posting) < len(rarest):
+                rarest = posting
+        texts = self._texts
+        return [position for position in rarest if query in texts[position]]
+
+    def matches(self, position, query):
+        """Whether text at position matches a query of search(), without looking at other texts"""
+        query = str(query).casefold()
+        if query.startswith(PREFIX):
+            return self._texts[position].startswith(query[len(PREFIX):])
+        return query in self._texts[position]
+
+    def prefix(self, query):
+        """Positions of texts starting with query in increasing order"""
+        query = str(query).casefold()
+        if query == "":
+            return range(len(self._texts))
+        if self._sorted is None:
+            self._sorted = sorted((text, position) for position, text in enumerate(self._texts))
+        result = []
+        for i in range(bisect_left(self._sorted, (query, -1)), len(self._sorted)):
+            text, position = self._sorted[i]
+            if not text.startswith(query):
+                break
+            result.append(position)
+        return sorted(result)
+
+class ProfileIndex:
+    def __init__(self, records=()):
+        """Index of [ssid, kind, key] records: SSID text, buckets by kind and counts of kinds"""
+        self.total = 0
+        self.counts = {}    # kind -> number of profiles
+        self.kinds = {}     # kind -> positions of its profiles
+        self._kindOf = []   # position -> kind
+        self._ssids = TextIndex()
+        for record in records:
+            self.add(record)
+
+    def add(self, record):
+        """Index a record which is appended, counts are updated at once"""
+        position = self._ssids.add(record[0])
+        self.total += 1
+        self.counts[record[1]] = self.counts.get(record[1], 0) + 1
+        self._kindOf.append(record[1])
+        bucket = self.kinds.get(record[1])
+        if bucket is None:
+            bucket = self.kinds[record[1]] = array("I")
+        bucket.append(position)
+        return position
+
+    def search(self, text="", kind=None):
+        """Positions of profiles whose SSID contains text ("^text": starts with it), of one kind when it is given"""
+        positions = self._ssids.search(text.strip())
+        if kind is None:
+            return list(positions)
+        bucket = self.kinds.get(kind, ())
+        if text.strip() == "":
+            return list(bucket)
+        if len(bucket) < len(positions):    # walk the smaller side, order stays increasing
+            matched = set(positions)
+            return [position for position in bucket if position in matched]
+        kinds = self._kindOf
+        return [position for position in positions if kinds[position] == kind]
+
+    def matches(self, position, text="", kind=None):
+        """Whether profile at position is a result of search(text, kind), e.g. for a profile which just arrives"""
+        if kind is not None and self._kindOf[position] != kind:
+            return False
+        return self._ssids.matches(position, text.strip())
+
+    def summary(self):
+        """Total and frequency of each kind, like "Total: 3      Open: 1      WPA2-Personal: 2      " """
+        report = "Total: " + str(self.total)
+        if self.total != 0:
+            report += "      "
+            for kind in sorted(self.counts):
+                report += kind + ": " + str(self.counts[kind]) + "      "
+        return report
+
+class NicIndex:
+    def __init__(self, nics=()):
+        """Index of properties of NICs (IpConfig.nics.values()): text of their detail rows and label=value pairs"""
+        self._rows = TextIndex()    # "label value" of every detail row
+        self._owners = []           # position of row text -> (NIC name, index in nic.rows())
+        self._names = TextIndex()
+        self._nicNames = []         # position of name -> NIC name
+        self._properties = {}       # (label, value) casefolded -> [(NIC name, index in nic.rows())]
+        for nic in nics:
+            self.add(nic)
+
+    def add(self, nic):
+        """Index a NIC, continuation rows of multi-valued labels belong to their label"""
+        self._names.add(nic.name)
+        self._nicNames.append(nic.name)
+        label = ""
+        for i, (name, value) in enumerate(nic.rows()):
+            label = name or label
+            self._rows.add(label + " " + value)
+            self._owners.append((nic.name, i))
+            self._properties.setdefault((label.casefold(), value.strip().casefold()), []).append((nic.name, i))
+
+    def search(self, query):
+        """{NIC name: indexes of matching detail rows} in order of adding, None for NICs matching by name only.
+
+        "Label=Value" matches a property exactly, e.g. "DHCP Enabled=No", any other text matches
+        names, labels and values containing it."""
+        query = query.strip()
+        result = {}
+        label, separator, value = query.partition("=")
+        if separator and label.strip() != "":
+            for name, row in self._properties.get((label.strip().casefold(), value.strip().casefold()), ()):
+                result.setdefault(name, []).append(row)
+            return result
+        for position in self._names.search(query):
+            result[self._nicNames[position]] = None
+        for position in self._rows.search(query):
+            name, row = self._owners[position]
+            if name not in result:
+                result[name] = [row]
+            elif result[name] is not None:  # a NIC matching by name shows all its rows
+                result[name].append(row)
+        return result
@@ -0,0 +1,170 @@
+import json
+import os
+import sqlite3
+import time
+import zlib
+from threading import Lock
+from urllib.parse import quote
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".network-info-app", "snapshots.db")
+DEFAULT_TTL = 10 * 60               # seconds a snapshot is fresh enough to be shown without revalidating
+MAX_SNAPSHOTS = 100                 # snapshots kept per kind, older ones are evicted
+MAX_BYTES = 32 * 1024 * 1024        # compressed payloads kept in total
+WLAN = "wlan"                       # kind of NetshWlan.toData()
+NICS = "nics"                       # kind of IpConfig.toData()
+
+class Snapshot:
+    __slots__ = ("id", "kind", "taken", "data")
+
+    def __init__(self, id, kind, taken, data):
+        """A saved result of a collector, data is its toData()"""
+        self.id = id
+        self.kind = kind
+        self.taken = taken      # unix time
+        self.data = data
+
+    @property
+    def age(self):
+        """Seconds since the snapshot was taken"""
+        return time.time() - self.taken
+
+class SnapshotStore:
+    def __init__(self, path=DEFAULT_PATH, ttl=DEFAULT_TTL, maxSnapshots=MAX_SNAPSHOTS, maxBytes=MAX_BYTES, readOnly=False):
+        """SQLite store of snapshots, payloads are compressed JSON.
+
+        Keys of wireless profiles are saved as well, the database is as sensitive as an export: a new
+        database is readable by its owner only, and so is a new directory of it.
+        readOnly=True opens an existing database without creating or changing anything, e.g. one of another host."""
+        self.path = path
+        self.ttl = ttl
+        self.maxSnapshots = maxSnapshots
+        self.maxBytes = maxBytes
+        self.readOnly = readOnly
+        self._lock = Lock()     # one writer at a time, the GUI saves from Tk loop while CLI may run
+        if readOnly:
+            return
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)   # keys are in clear text, only the owner may read them
+        try:    # SQLite would create the database readable by everybody
+            os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+        except FileExistsError:
+            pass
+        else:
+            os.chmod(path, 0o600)       # whatever the umask is
+        with self.__connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS snapshots (id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                               "kind TEXT NOT NULL, taken REAL NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL)")
+            connection.execute("CREATE INDEX IF NOT EXISTS snapshots_kind_taken ON snapshots (kind, taken)")
+
+    def __connect(self):
+        """A connection per call, so the store may be used from any thread"""
+        if self.readOnly:
+            path = os.path.abspath(self.path).replace(os.sep, "/")
+            connection = sqlite3.connect("file:" + ("" if path.startswith("/") else "/") + quote(path, safe="/:") + "?mode=ro",
+                                         timeout=10, uri=True)
+        else:
+            connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA mmap_size = 67108864")  # read payloads through memory mapping
+        return connection
+
+    def isStore(self):
+        """Whether the database has a snapshots table, other SQLite files or files which are no database have none"""
+        try:
+            connection = self.__connect()
+        except sqlite3.Error:
+            return False
+        try:
+            return connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'snapshots'").fetchone() is not None
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            connection.close()
+
+    def save(self, kind, data, taken=None):
+        """Save data of a kind, evict old snapshots, return id of the new snapshot"""
+        payload = zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 6)
+        with self._lock:
+            connection = self.__connect()
+            try:
+                with connection:
+                    cursor = connection.execute("INSERT INTO snapshots (kind, taken, size, payload) VALUES (?, ?, ?, ?)",
+                                                (kind, taken if taken is not None else time.time(), len(payload), payload))
+                    self.__evict(connection, kind)
+                return cursor.lastrowid
+            finally:
+                connection.close()
+
+    def __evict(self, connection, kind):
+        """Keep maxSnapshots newest snapshots of kind and at most maxBytes of payloads overall"""
+        connection.execute("DELETE FROM snapshots WHERE kind = ? AND id NOT IN "
+                           "(SELECT id FROM snapshots WHERE kind = ? ORDER BY taken DESC, id DESC LIMIT ?)",
+                           (kind, kind, self.maxSnapshots))
+        total = 0
+        stale = []
+        rows = connection.execute("SELECT id, size FROM snapshots ORDER BY taken DESC, id DESC").fetchall()
+        for index, (id, size) in enumerate(rows):
+            total += size
+            if total > self.maxBytes and index != 0:    # the newest snapshot always stays
+                stale.append((id,))
+        connection.executemany("DELETE FROM snapshots WHERE id = ?", stale)
+
+    def latest(self, kind):
+        """Newest snapshot of a kind, None when there is none"""
+        return self.__load("SELECT id, kind, taken, payload FROM snapshots WHERE kind = ? ORDER BY taken DESC, id DESC LIMIT 1",
+                           (kind,))
+
+    def fresh(self, kind):
+        """Newest snapshot of a kind when it is younger than ttl, otherwise None"""
+        snapshot = self.latest(kind)
+        if snapshot is not None and snapshot.age <= self.ttl:
+            return snapshot
+        return None
+
+    def load(self, id):
+        """Snapshot by id, None when it is evicted"""
+        return self.__load("SELECT id, kind, taken, payload FROM snapshots WHERE id = ?", (id,))
+
+    def __load(self, query, parameters):
+        """Snapshot of the first row of a query"""
+        connection = self.__connect()
+        try:
+            row = connection.execute(query, parameters).fetchone()
+        finally:
+            connection.close()
+        if row is None:
+            return None
+        return Snapshot(row[0], row[1], row[2], json.loads(zlib.decompress(row[3]).decode("utf-8")))
+
+    def history(self, kind):
+        """[(id, taken, compressed size)] of a kind, newest first"""
+        connection = self.__connect()
+        try:
+            return connection.execute("SELECT id, taken, size FROM snapshots WHERE kind = ? ORDER BY taken DESC, id DESC",
+                                      (kind,)).fetchall()
+        finally:
+            connection.close()
+
+def diff(old, new):
+    """Changes from snapshot old to snapshot new of the same kind: {"added": [...], "removed": [...], "changed": [...]}.
+
+    Wireless profiles are compared by SSID, changed entries are (ssid, old record, new record).
+    NICs are compared by name, changed entries are (name, [(label, old value, new value)])."""
+    if old.kind != new.kind:
+        raise ValueError("Cannot compare snapshots of " + old.kind + " and " + new.kind)
+    if old.kind == WLAN:
+        before = {record[0]: record for record in old.data["listInfo"]}
+        after = {record[0]: record for record in new.data["listInfo"]}
+        changed = [(ssid, before[ssid], after[ssid]) for ssid in after if ssid in before and before[ssid] != after[ssid]]
+    else:
+        before = dict((name, fields) for name, fields in old.data["nics"])
+        after = dict((name, fields) for name, fields in new.data["nics"])
+        changed = []
+        for name in after:
+            if name in before and before[name] != after[name]:
+                labels = list(before[name]) + [label for label in after[name] if label not in before[name]]
+                changed.append((name, [(label, before[name].get(label), after[name].get(label)) for label in labels
+                                       if before[name].get(label) != after[name].get(label)]))
+    return {"added": [key for key in after if key not in before],
+            "removed": [key for key in before if key not in after],
+            "changed": changed}
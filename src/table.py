@@ -1,18 +1,60 @@
 from tkinter import *
 from tkinter.ttk import *
-from copy import deepcopy
+import instrument
+
+# Tcl procedure which sets a column of many rows, one call from Python instead of one per row
+_SET_COLUMN_PROC = "proc ::tableSetColumn {tree column data} { foreach {iid value} $data { $tree set $iid $column $value } }"
+OVERSCAN = 10   # rows materialized above and below the visible ones in virtual mode
+WHEEL_STEP = 3  # rows scrolled by a mouse wheel notch in virtual mode
+SORT_ARROWS = (" \u25b2", " \u25bc")   # ascending, descending marks of sorted column heading
 
 class Table:
-    def __init__(self, window, scrollbar=True, height=20):
-        """Contruct elements of the table."""
+    def __init__(self, window, scrollbar=True, height=20, virtual=False):
+        """Contruct elements of the table.
+
+        virtual=True keeps rows in a backing store and only materializes the visible rows
+        (plus OVERSCAN) in treeview, for very large datasets."""
         self.__frame = Frame(window)    # create a frame to contain tableiew and scrollbar
         self.__table = Treeview(self.__frame, selectmode="browse", height=height) # create a treeview as a table
         self.__table.pack(side = LEFT)
+        self.__height = height
+        self.__virtual = virtual
+        self.__order = []   # iids of rows from top to bottom, backing store (mirror of treeview when not virtual)
+        self.__values = {}  # iid -> values of row as they are shown
+        self.__keys = {}    # key -> iid of rows which are inserted with a key
+        self.__lastId = 0   # virtual mode: counter for generating iids
+        self.__offset = 0   # virtual mode: index of first visible row
+        self.__shown = {}   # virtual mode: iid -> values of materialized rows
+        self.__shownOrder = []  # virtual mode: materialized iids from top to bottom
+        self.__focus = ""   # virtual mode: focused row, which may be not materialized
+        self.__renderPending = False
+        self.__scrollbar = None
+        self.__maskColumn = None    # index in values of masked column
+        self.__masker = None
+        self.__masked = False       # whether masked column shows masked renderings
+        self.__clearCells = {}      # iid -> clear rendering of masked column
+        self.__maskedCells = {}     # iid -> masked rendering of masked column, computed once per row
+        self.__visible = self.__order   # iids which are shown, the backing store itself unless filtered or sorted
+        self.__positions = None     # positions of rows which view() keeps, None shows all rows
+        self.__headers = []
+        self.__sortColumn = None    # index in values of column which rows are sorted by
+        self.__sortReverse = False
+        self.__sorted = None        # all iids in sorted order, dropped when rows change
 
         if scrollbar:   # create a scrollbar for the treeview
-            vScrollbar = Scrollbar(self.__frame, command=self.__table.yview)
-            vScrollbar.pack(side = RIGHT, fill = Y)
-            self.__table.configure(yscrollcommand = vScrollbar.set)
+            if virtual:     # scrollbar position is mapped to offset in backing store
+                self.__scrollbar = Scrollbar(self.__frame, command=self.__onScroll)
+            else:
+                self.__scrollbar = Scrollbar(self.__frame, command=self.__table.yview)
+                self.__table.configure(yscrollcommand = self.__scrollbar.set)
+            self.__scrollbar.pack(side = RIGHT, fill = Y)
+
+        if virtual:     # treeview only holds a window of rows, so scrolling is handled here
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.__table.bind(sequence, self.__onWheel)
+            for sequence in ("<Up>", "<Down>", "<Prior>", "<Next>", "<Home>", "<End>"):
+                self.__table.bind(sequence, self.__onKey)
+            self.__table.bind("<<TreeviewSelect>>", self.__onSelect)
 
     def construct(self, header, width, idcolumn=True, anchor="c"):
         """Contruct structure of table."""
@@ -27,47 +69,499 @@ class Table:
         for i in range(0, len(header)):     # available for use
             self.__table.column(index[i], width=width[i], anchor=anchor)
             self.__table.heading(index[i], text=header[i])
+        self.__headers = list(header)
+
+    def enableSorting(self):
+        """Sort rows by a column when its heading is clicked, a second click reverses order"""
+        for i in range(len(self.__headers)):
+            self.__table.heading(str(i + 1), command=lambda index=i: self.__onHeading(index))
+
+    def __onHeading(self, index):
+        """Heading click: sort ascending by a new column, toggle direction of sorted column"""
+        self.sortBy(index + 1, self.__sortColumn == index and not self.__sortReverse)
+
+    def sortBy(self, column, reverse=False):
+        """Show rows sorted by values of a column, numbers by their value and text without case. None restores order."""
+        if self.__sortColumn is not None:
+            self.__table.heading(str(self.__sortColumn + 1), text=self.__headers[self.__sortColumn])
+        self.__sortColumn = int(column) - 1 if column is not None else None
+        self.__sortReverse = reverse
+        self.__sorted = None
+        if self.__sortColumn is not None:
+            self.__table.heading(str(column), text=self.__headers[self.__sortColumn] + SORT_ARROWS[1 if reverse else 0])
+        self.__applyView()
+
+    def view(self, positions=None):
+        """Show only rows at positions (0-based, in order of filling), e.g. results of a search.
+
+        Rows keep their values and ID, an active sort still applies. None shows all rows."""
+        self.__positions = list(positions) if positions is not None else None
+        self.__applyView()
+
+    def __applyView(self):
+        """Rebuild visible rows from positions of view() and sorting"""
+        if self.__positions is None and self.__sortColumn is None:
+            visible = self.__order
+        else:
+            rows = self.__sortedRows() if self.__sortColumn is not None else self.__order
+            if self.__positions is None:
+                visible = list(rows)
+            elif self.__sortColumn is None:
+                visible = [rows[position] for position in self.__positions if position < len(rows)]
+            else:   # filter the sorted rows, cheaper than sorting every result again
+                wanted = set(self.__order[position] for position in self.__positions if position < len(self.__order))
+                visible = [iid for iid in rows if iid in wanted]
+        self.__visible = visible
+        if self.__virtual:
+            self.__offset = 0
+            self.__scheduleRender()
+        else:   # detach all rows, then attach visible ones in order
+            if len(self.__order) != 0:
+                self.__table.detach(*self.__order)
+            for position, iid in enumerate(visible):
+                self.__table.move(iid, "", position)
+
+    def __sortedRows(self):
+        """All iids sorted by sort column, computed once until rows change"""
+        if self.__sorted is None:
+            index = self.__sortColumn
+            self.__sorted = sorted(self.__order, key=lambda iid: _sortKey(self.__values[iid][index]), reverse=self.__sortReverse)
+        return self.__sorted
+
+    def __resetView(self):
+        """Show all rows in their order before rows are rebuilt, sorting is applied again afterwards"""
+        self.__positions = None
+        self.__sorted = None
+        if self.__visible is not self.__order:
+            self.__visible = self.__order
+            if not self.__virtual:
+                for position, iid in enumerate(self.__order):
+                    self.__table.move(iid, "", position)
+
+    def fill(self, datasource, key=None, keys=None):
+        """Fill data in table. Must construct structure of table first.
+
+        Rows are registered by key(record), or by keys given in order of datasource, so a later sync with
+        the same keys only applies differences."""
+        with instrument.stage("table.fill"):
+            if keys is None and key is not None:
+                keys = [key(record) for record in datasource]
+            for i in range(0, len(datasource)):
+                values, cell = self.__prepare(datasource[i], i + 1)   # copy, datasource is not changed
+                iid = self.__insert(END, values)     # insert each record into table
+                self.__remember(iid, cell)
+                if keys is not None:
+                    self.__keys[keys[i]] = iid
+
+    def append(self, record, key=None, visible=True):
+        """Append a record at the end of table, used for filling progressively. key lets sync match the row later.
+
+        While rows are filtered or sorted, the row is added at the end of shown rows, or kept hidden when visible is False."""
+        values, cell = self.__prepare(record, len(self.__order) + 1)
+        iid = self.__insert(END, values, visible)
+        self.__remember(iid, cell)
+        if key is not None:
+            self.__keys[key] = iid
+        return iid
+
+    def sync(self, datasource, key=lambda record: record[0], keys=None):
+        """Make table show datasource by applying only inserts, updates and deletes.
+
+        Rows are matched by key(record), or by keys given in order of datasource when records themselves
+        are not unique; unchanged rows are not touched so selection and focus are kept.
+        A filter of view() is dropped, sorting is kept."""
+        with instrument.stage("table.sync"):
+            keys = list(keys) if keys is not None else [key(record) for record in datasource]
+            self.__resetView()
+            if self.__virtual:  # only backing store changes, visible rows are rendered afterwards
+                self.__syncStore(datasource, keys)
+            else:
+                self.__syncRows(datasource, keys)
+            self.__visible = self.__order   # backing store is a new list
+            if self.__sortColumn is not None:
+                self.__applyView()
+
+    def __syncRows(self, datasource, keys):
+        """sync of treeview rows, keys are in order of datasource"""
+        matched = set()
+        for k in keys:
+            iid = self.__keys.get(k)
+            if iid in self.__values:
+                matched.add(iid)
+        stale = [iid for iid in self.__order if iid not in matched]
+        if len(stale) != 0:     # delete rows which disappear, in one call
+            self.__table.delete(*stale)
+            for iid in stale:
+                self.__forget(iid)
+            self.__order = [iid for iid in self.__order if iid in matched]
+            self.__keys = {k: iid for k, iid in self.__keys.items() if iid in matched}
+
+        surviving = self.__order
+        self.__order = []
+        placed = set()
+        for position, record in enumerate(datasource):
+            values, cell = self.__prepare(record, position + 1)
+            k = keys[position]
+            iid = self.__keys.get(k)
+            if iid is None or iid in placed:    # new row, or a repeated key which must not share a row
+                iid = self.__table.insert("", position, values=values)
+                instrument.count("table.rows")
+                self.__values[iid] = values
+                self.__keys.setdefault(k, iid)
+            elif self.__values[iid] != values:
+                self.__table.item(iid, values=values)
+                self.__values[iid] = values
+            self.__remember(iid, cell)
+            self.__order.append(iid)
+            placed.add(iid)
+
+        if [iid for iid in self.__order if iid in matched] != surviving:
+            for position, iid in enumerate(self.__order):   # surviving rows change their order, move them all
+                self.__table.move(iid, "", position)
+
+    def __syncStore(self, datasource, keys):
+        """sync in virtual mode: rebuild backing store, keep iids of matched rows"""
+        order = []
+        values = {}
+        known = {}
+        if self.__maskColumn is not None:
+            self.__clearCells = {}
+            self.__maskedCells = {}
+        for position, record in enumerate(datasource):
+            row, cell = self.__prepare(record, position + 1)
+            k = keys[position]
+            iid = self.__keys.get(k)
+            if iid is None or iid not in self.__values or iid in values:    # a repeated key gets its own row
+                iid = self.__newId()
+            order.append(iid)
+            values[iid] = row
+            known.setdefault(k, iid)
+            self.__remember(iid, cell)
+        self.__order = order
+        self.__values = values
+        self.__keys = known
+        if self.__focus not in values:
+            self.__focus = ""
+        self.__scheduleRender()
+
+    def __newId(self):
+        """Generate an iid for virtual mode"""
+        self.__lastId += 1
+        return "R" + str(self.__lastId)
+
+    def __prepare(self, record, number):
+        """Values of a row as they are shown (id field first, masked column rendered by current mode)
+        and (clear, masked) renderings of masked column, None when no column is masked"""
+        values = list(record)
+        if self.__idColumn:
+            values.insert(0, str(number))
+        if self.__maskColumn is None:
+            return values, None
+        cell = (values[self.__maskColumn], self.__masker(values[self.__maskColumn]))
+        values[self.__maskColumn] = cell[1] if self.__masked else cell[0]
+        return values, cell
+
+    def __remember(self, iid, cell):
+        """Keep both renderings of masked column of a row, so switching does not compute them again"""
+        if cell is not None:
+            self.__clearCells[iid] = cell[0]
+            self.__maskedCells[iid] = cell[1]
 
-    def fill(self, datasource):
-        """Fill data in table. Must construct structure of table first."""
-        datasource_cpy = deepcopy(datasource)
-        for i in range(0, len(datasource_cpy)):
-            if self.__idColumn:
-                datasource_cpy[i].insert(0, str(i + 1))     # id field - first column
-            self.__table.insert("", END, values=(datasource_cpy[i]))     # insert each record into table
+    def __forget(self, iid):
+        """Drop a row from backing store"""
+        del self.__values[iid]
+        self.__clearCells.pop(iid, None)
+        self.__maskedCells.pop(iid, None)
+
+    def __insert(self, index, values, visible=True):
+        """Insert a row into backing store, and into treeview when not virtual"""
+        instrument.count("table.rows")
+        self.__sorted = None
+        if self.__virtual:
+            iid = self.__newId()
+            self.__scheduleRender()
+        else:
+            iid = self.__table.insert("", index, values=values)
+        if index == END:
+            self.__order.append(iid)
+        else:
+            self.__order.insert(index, iid)
+        self.__values[iid] = values
+        if self.__visible is not self.__order:  # rows are filtered or sorted
+            if visible:
+                self.__visible.append(iid)
+            elif not self.__virtual:
+                self.__table.detach(iid)
+        return iid
 
     def bind(self, event, function):
         """Bind an event to a function"""
-        self.__table.bind(event, function)
-    
-    def focus(self):
-        """Get current row"""
-        return self.__table.focus()
+        self.__table.bind(event, function, add="+")    # keep bindings of virtual mode
+
+    def focus(self, item=None):
+        """Get current row, or focus and show a row"""
+        if item is None:
+            return self.__focus if self.__virtual else self.__table.focus()
+        if self.__virtual:
+            self.__focus = item
+            self.see(item)
+        else:
+            self.__table.focus(item)
+            self.__table.selection_set(item)
+            self.__table.see(item)
+
+    def see(self, item):
+        """Scroll table so that a row is visible"""
+        if not self.__virtual:
+            self.__table.see(item)
+            return
+        if item not in self.__values or (self.__visible is not self.__order and item not in self.__visible):
+            return  # unknown or filtered out
+        index = self.__visible.index(item)
+        if index < self.__offset:
+            self.__offset = index
+        elif index >= self.__offset + self.__height:
+            self.__offset = index - self.__height + 1
+        self.__render()
 
     def item(self, object, key=None):
-        """Analyze current row"""
-        return self.__table.item(object, key)
-    
+        """Analyze current row.
+
+        Like treeview, item(iid, "values") is a tuple of values as they are inserted, and
+        item(iid)["values"] is a list in which numbers are converted to int."""
+        if not self.__virtual:
+            return self.__table.item(object, key)
+        values = self.__values.get(object)
+        if values is None:  # like treeview: root or unknown row has no values
+            return "" if key is not None else {"text": "", "image": "", "values": "", "open": 0, "tags": ""}
+        if key == "values":
+            return tuple(values)
+        result = {"text": "", "image": "", "values": [_convert(value) for value in values], "open": 0, "tags": ""}
+        return result if key is None else result[key]
+
     def delete(self, item):
         """Delete an item in table"""
-        self.__table.delete(item)
-    
+        if self.__virtual:
+            self.__scheduleRender()
+        else:
+            self.__table.delete(item)
+        self.__order.remove(item)
+        if self.__visible is not self.__order and item in self.__visible:
+            self.__visible.remove(item)
+        self.__sorted = None
+        self.__forget(item)
+        self.__keys = {k: iid for k, iid in self.__keys.items() if iid != item}
+
+    def clear(self):
+        """Delete all items in table at once"""
+        if self.__virtual:
+            self.__offset = 0
+            self.__focus = ""
+            self.__scheduleRender()
+        else:
+            self.__table.delete(*self.__order)
+        if self.__sortColumn is not None:
+            self.__table.heading(str(self.__sortColumn + 1), text=self.__headers[self.__sortColumn])
+        self.__sortColumn = None
+        self.__positions = None
+        self.__sorted = None
+        self.__order = []
+        self.__visible = self.__order
+        self.__values = {}
+        self.__keys = {}
+        self.__clearCells = {}
+        self.__maskedCells = {}
+
     def set(self, item, column=None, value=None):
-        """Set value for a cell in table"""
-        self.__table.set(item, column=column, value=value)
+        """Set value for a cell in table, a value of masked column is its clear value.
+
+        Like treeview, set(iid, column) returns value of a cell and set(iid) values of all columns."""
+        if value is not None and self.__maskColumn is not None and int(column) - 1 == self.__maskColumn:
+            self.__clearCells[item] = value
+            self.__maskedCells[item] = self.__masker(value)
+            value = self.__maskedCells[item] if self.__masked else value
+        if value is not None:
+            self.__values[item][int(column) - 1] = value
+            if int(column) - 1 == self.__sortColumn:    # order is computed again on next sort
+                self.__sorted = None
+        if not self.__virtual:
+            return self.__table.set(item, column=column, value=value)
+        if column is None:  # like treeview: {column id: value} of the row
+            return {str(i + 1): cell for i, cell in enumerate(self.__values[item])}
+        if value is None:
+            return self.__values[item][int(column) - 1]
+        if item in self.__shown:    # only materialized rows reach treeview
+            self.__table.set(item, column=column, value=value)
+            self.__shown[item][int(column) - 1] = value
+
+    def setColumn(self, column, values):
+        """Set a whole column at once, values are given from top to bottom row, in one Tcl call"""
+        self.__applyColumn(int(column) - 1, zip(self.__order, values))
+
+    def mask(self, column, masker=lambda value: "*" * len(value)):
+        """Make a column maskable, masked and clear renderings are precomputed for every row"""
+        self.__maskColumn = int(column) - 1
+        self.__masker = masker
+        self.__clearCells = {}
+        self.__maskedCells = {}
+        for iid in self.__order:    # rows which are inserted before, their current value is the clear one
+            clear = self.__values[iid][self.__maskColumn]
+            self.__clearCells[iid] = clear
+            self.__maskedCells[iid] = masker(clear)
+        self.__masked = False
+
+    def showMasked(self, masked):
+        """Switch masked column between masked and clear renderings as one batched operation"""
+        if self.__maskColumn is None or masked == self.__masked:
+            return
+        self.__masked = masked
+        cells = self.__maskedCells if masked else self.__clearCells
+        self.__applyColumn(self.__maskColumn, ((iid, cells[iid]) for iid in self.__order))
+
+    def __applyColumn(self, index, pairs):
+        """Set column index of rows from (iid, value) pairs in backing store and treeview"""
+        started = instrument.clock()
+        if index == self.__sortColumn:
+            self.__sorted = None
+        data = []
+        for iid, value in pairs:
+            self.__values[iid][index] = value
+            data.append(iid)
+            data.append(value)
+        if self.__virtual:  # only materialized rows are updated, by render
+            self.__scheduleRender()
+        elif len(data) != 0:
+            self.__table.tk.eval(_SET_COLUMN_PROC)
+            self.__table.tk.call("::tableSetColumn", str(self.__table), str(index + 1), tuple(data))
+        instrument.finish("table.column", started)
 
     def get_children(self):
-        """Get children from treeview"""
+        """Get children from treeview, rows hidden by view() are left out"""
+        if self.__virtual:  # all shown rows of backing store, not only materialized ones
+            return tuple(self.__visible)
         return self.__table.get_children()
 
+    def __scheduleRender(self):
+        """Render once when Tk is idle, many changes in a row cost one render"""
+        if not self.__renderPending:
+            self.__renderPending = True
+            self.__table.after_idle(self.__render)
+
+    def __render(self):
+        """Materialize visible rows plus OVERSCAN of backing store into treeview"""
+        started = instrument.clock()
+        self.__renderPending = False
+        total = len(self.__visible)
+        self.__offset = max(0, min(self.__offset, total - self.__height))
+        start = max(0, self.__offset - OVERSCAN)
+        end = min(total, self.__offset + self.__height + OVERSCAN)
+        desired = self.__visible[start:end]
+
+        if desired != self.__shownOrder:
+            keep = set(desired)
+            gone = [iid for iid in self.__shownOrder if iid not in keep]
+            if len(gone) != 0:
+                self.__table.delete(*gone)
+                for iid in gone:
+                    del self.__shown[iid]
+            surviving = [iid for iid in self.__shownOrder if iid in keep]
+            if surviving != [iid for iid in desired if iid in self.__shown]:   # rows change their order, rebuild window
+                self.__table.delete(*surviving)
+                self.__shown = {}
+            for position, iid in enumerate(desired):
+                if iid not in self.__shown:
+                    self.__table.insert("", position, iid=iid, values=self.__values[iid])
+                    self.__shown[iid] = list(self.__values[iid])
+                    instrument.count("table.materialized")
+            self.__shownOrder = desired
+        for iid in desired:     # rows whose values change in backing store
+            if self.__shown[iid] != self.__values[iid]:
+                self.__table.item(iid, values=self.__values[iid])
+                self.__shown[iid] = list(self.__values[iid])
+
+        if len(desired) != 0:   # put first visible row at top of treeview
+            self.__table.yview_moveto((self.__offset - start) / len(desired))
+        if self.__focus in self.__shown:
+            if self.__table.focus() != self.__focus:
+                self.__table.focus(self.__focus)
+                self.__table.selection_set(self.__focus)
+        elif len(self.__table.selection()) != 0:
+            self.__table.selection_remove(*self.__table.selection())
+        if self.__scrollbar is not None:
+            if total == 0:
+                self.__scrollbar.set(0, 1)
+            else:
+                self.__scrollbar.set(self.__offset / total, min(1, (self.__offset + self.__height) / total))
+        instrument.finish("table.render", started)
+
+    def __onScroll(self, *args):
+        """Scrollbar command in virtual mode: ("moveto", fraction) or ("scroll", number, "units" or "pages")"""
+        if args[0] == "moveto":
+            self.__offset = int(float(args[1]) * len(self.__visible))
+        elif args[0] == "scroll":
+            self.__offset += int(args[1]) * (self.__height if args[2] == "pages" else 1)
+        self.__render()
+
+    def __onWheel(self, event):
+        """Mouse wheel in virtual mode, Button-4/5 on X11 and MouseWheel elsewhere"""
+        if event.num == 4 or event.delta > 0:
+            self.__offset -= WHEEL_STEP
+        else:
+            self.__offset += WHEEL_STEP
+        self.__render()
+        return "break"
+
+    def __onKey(self, event):
+        """Keyboard navigation in virtual mode, moves focus through backing store"""
+        rows = self.__visible
+        if len(rows) == 0:
+            return "break"
+        index = rows.index(self.__focus) if self.__focus in self.__values and self.__focus in rows else -1
+        steps = {"Up": -1, "Down": 1, "Prior": -self.__height, "Next": self.__height}
+        if event.keysym == "Home":
+            index = 0
+        elif event.keysym == "End":
+            index = len(rows) - 1
+        else:
+            index = max(0, min(len(rows) - 1, index + steps[event.keysym]))
+        self.focus(rows[index])
+        return "break"
+
+    def __onSelect(self, event):
+        """Remember focused row of virtual mode, it outlives its materialized treeview item"""
+        if self.__table.focus() != "":
+            self.__focus = self.__table.focus()
+
     def grid(self, column=0, columnspan=1, sticky=NW, padx=0, pady=0, row=0, rowspan=1):
         """Position a table by grid."""
         self.__frame.grid(column=column, columnspan=columnspan, sticky=sticky, padx=padx, pady=pady, row=row, rowspan=rowspan)
 
+    def grid_remove(self):
+        """Hide a table positioned by grid, grid() shows it again at the same place."""
+        self.__frame.grid_remove()
+
+    def destroy(self):
+        """Destroy a table with its treeview and scrollbar."""
+        self.__frame.destroy()
+
     def pack(self, expand=True, fill=NONE, side=TOP):
         """Position a table by pack."""
         self.__frame.pack(expand=expand, fill=fill, side=side)
 
     def place(self, anchor=NW, bordermode=INSIDE, x=0, y=0):
         """Position a table by place."""
-        self.__frame.place(anchor=anchor, bordermode=bordermode, x=x, y=y)
\ No newline at end of file
+        self.__frame.place(anchor=anchor, bordermode=bordermode, x=x, y=y)
+
+def _sortKey(value):
+    """Sort key of a cell: numbers by their value before text, text without case"""
+    try:
+        return (0, int(value), "")
+    except (TypeError, ValueError):
+        return (1, 0, str(value).casefold())
+
+def _convert(value):
+    """Convert a value like treeview does when it returns values of an item: numbers become int"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
@@ -0,0 +1,72 @@
+from queue import Queue, Empty
+from threading import Thread, Event
+
+POLL_INTERVAL = 50      # milliseconds between two polls of Tk loop
+BATCH_SIZE = 100        # maximum items handled in one poll, keep window responsive
+
+class BackgroundTask:
+    def __init__(self, widget, producer, onItem, onDone=None):
+        """Run producer in a worker thread and hand its items over to Tk loop.
+
+        producer(cancelled) is a generator function, cancelled is a threading.Event it should check.
+        onItem(item) is called in Tk loop for every produced item, in order.
+        onDone(error, cancelled) is called in Tk loop when the producer stops."""
+        self._widget = widget
+        self._producer = producer
+        self._onItem = onItem
+        self._onDone = onDone
+        self._queue = Queue()   # thread-safe channel from worker to Tk loop
+        self.cancelled = Event()
+        self.discarded = False  # nothing is handed over anymore
+        self.running = False
+        self._thread = Thread(target=self.__run, daemon=True)
+
+    def start(self):
+        """Start worker and polling"""
+        self.running = True
+        self._thread.start()
+        self._widget.after(POLL_INTERVAL, self.__poll)
+        return self
+
+    def cancel(self, discard=False):
+        """Ask worker to stop, items which are already produced are still handed over.
+
+        discard=True drops them and onDone is not called, the task stops running at once."""
+        if discard:
+            self.discarded = True
+            self.running = False
+        self.cancelled.set()
+
+    def __run(self):
+        """Body of worker thread"""
+        items = self._producer(self.cancelled)
+        try:
+            for item in items:
+                if self.cancelled.is_set():
+                    break
+                self._queue.put((True, item))
+            self._queue.put((False, None))
+        except Exception as e:
+            self._queue.put((False, e))
+        finally:    # a producer which stops early releases its resources now, e.g. queued processes
+            close = getattr(items, "close", None)
+            if close is not None:
+                close()
+
+    def __poll(self):
+        """Drain queue in Tk loop, reschedule until worker finishes"""
+        if self.discarded:  # worker winds down by itself
+            return
+        for _ in range(BATCH_SIZE):
+            try:
+                isItem, value = self._queue.get_nowait()
+            except Empty:
+                break
+            if isItem:
+                self._onItem(value)
+            else:   # worker finished, value is its error if any
+                self.running = False
+                if self._onDone is not None:
+                    self._onDone(value, self.cancelled.is_set())
+                return
+        self._widget.after(POLL_INTERVAL, self.__poll)
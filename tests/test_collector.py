@@ -0,0 +1,84 @@
+"""NetshWlan querying profiles concurrently: order, failures and cancellation, over a synthetic runner."""
+import os
+import sys
+import threading
+import time
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from collector import NetshWlan
+from synthetic import SyntheticRunner, wlanRecords, ssidOf
+
+PROFILE_COMMAND = "netsh wlan show profiles name = \""
+
+class FlakyRunner(SyntheticRunner):
+    def __init__(self, profiles, broken=(), latency=0.0):
+        """Synthetic runner whose profile commands sleep, later profiles shorter so they finish first, broken SSIDs raise"""
+        SyntheticRunner.__init__(self, profiles)
+        self.broken = set(broken)
+        self.profileLatency = latency
+        self.started = 0    # number of profile commands which are started
+        self._startedLock = threading.Lock()
+
+    def _run(self, command):
+        if command.startswith(PROFILE_COMMAND):
+            with self._startedLock:
+                self.started += 1
+            ssid = command[len(PROFILE_COMMAND):command.rindex("\"")]
+            time.sleep(self.profileLatency * (1 + (self._indexes[ssid] * 7) % 5) / 5)
+            if ssid in self.broken:
+                raise OSError("netsh failed for " + ssid)
+        return SyntheticRunner._run(self, command)
+
+class NetshWlanTest(unittest.TestCase):
+    def testOriginalOrder(self):
+        for workers in (1, 8):
+            with self.subTest(workers=workers):
+                network = NetshWlan(workers=workers, runner=FlakyRunner(40, latency=0.01))
+                self.assertEqual(network.listInfo, wlanRecords(40))
+                self.assertEqual(network.failures, [])
+
+    def testFailuresPerProfile(self):
+        broken = (ssidOf(3), ssidOf(17))
+        network = NetshWlan(workers=8, load=False, runner=FlakyRunner(20, broken=broken, latency=0.005))
+        results = list(network.iterLoad(workers=8))
+        self.assertEqual([ssid for ssid, record, error in results], [ssidOf(i) for i in range(20)])
+        self.assertEqual([ssid for ssid, error in network.failures], list(broken))
+        for ssid, error in network.failures:
+            self.assertIsInstance(error, OSError)
+            self.assertIn(ssid, str(error))
+        self.assertEqual(network.listInfo, [record for record in wlanRecords(20) if record[0] not in broken])
+
+    def testCancelSkipsQueuedProfiles(self):
+        runner = FlakyRunner(200, latency=0.01)
+        network = NetshWlan(workers=4, load=False, runner=runner)
+        cancelled = threading.Event()
+        count = 0
+        for result in network.iterLoad(workers=4, cancelled=cancelled):
+            count += 1
+            if count == 5:
+                cancelled.set()
+        self.assertEqual(count, 5)
+        self.assertEqual(len(network.listInfo), 5)
+        self.assertLess(self.settled(runner), 50)
+
+    def testCloseSkipsQueuedProfiles(self):
+        runner = FlakyRunner(200, latency=0.01)
+        results = NetshWlan(workers=4, load=False, runner=runner).iterLoad(workers=4)
+        for i in range(3):
+            next(results)
+        results.close()
+        self.assertLess(self.settled(runner), 50)
+
+    def settled(self, runner):
+        """Number of profile commands started once running ones are finished, it must not grow any more"""
+        time.sleep(0.1)
+        started = runner.started
+        time.sleep(0.1)
+        self.assertEqual(runner.started, started)
+        return started
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Round trips of exports in every format, compressed or not, and their use by aggregate.
+
+    python -m unittest discover tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from export import exportRecords, readRecords, profileRecords, nicRecords, PROFILE_FIELDS, NIC_FIELDS, FORMATS, BATCH_SIZE
+from aggregate import loadSource, aggregate
+from parsers import Nic
+
+PROFILES = [["HomeNet", "WPA2-Personal", "correct horse battery"], ["Guest; Net, \"5\"", "Open", "None"],
+            ["Ümlaut 日本", "WPA3-Personal", "kéy\nwith newline"]]
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="netinfo-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def roundTrip(self, name, records, fieldnames):
+        """Export records, read them back as (fieldnames, records)"""
+        path = os.path.join(self.directory, name)
+        self.assertEqual(exportRecords(records, path, fieldnames), len(records))
+        fields, loaded = readRecords(path)
+        return fields, list(loaded)
+
+    def testProfilesInEveryFormat(self):
+        expected = [[str(value) for value in record] for record in profileRecords(PROFILES)]
+        for format in FORMATS:
+            for suffix in ("", ".gz"):
+                with self.subTest(format=format + suffix):
+                    fields, records = self.roundTrip("pc." + format + suffix, list(profileRecords(PROFILES)), PROFILE_FIELDS)
+                    self.assertEqual(fields, PROFILE_FIELDS)
+                    self.assertEqual(records, expected)
+
+    def testManyBatches(self):
+        records = [[i, "Network " + str(i), "Open", "None"] for i in range(2 * BATCH_SIZE + 7)]
+        for format in FORMATS:
+            with self.subTest(format=format):
+                fields, loaded = self.roundTrip("many." + format, records, PROFILE_FIELDS)
+                self.assertEqual(len(loaded), len(records))
+                self.assertEqual(loaded[-1], [str(value) for value in records[-1]])
+
+    def testEmptyKeepsFieldnames(self):
+        for format in FORMATS:
+            for suffix in ("", ".gz"):
+                with self.subTest(format=format + suffix):
+                    fields, records = self.roundTrip("empty." + format + suffix, [], NIC_FIELDS)
+                    self.assertEqual(fields, NIC_FIELDS)
+                    self.assertEqual(records, [])
+
+    def testEmptyInventoryIsAggregated(self):
+        for format in FORMATS:
+            with self.subTest(format=format):
+                path = os.path.join(self.directory, "pc-7.profiles." + format)
+                exportRecords([], path, PROFILE_FIELDS)
+                self.assertEqual(loadSource(path), (path, [["pc-7", [], []]], None))
+
+    def testAggregateWithPool(self):
+        for host in range(3):
+            exportRecords(profileRecords(PROFILES[host:]), os.path.join(self.directory, "pc-" + str(host) + ".profiles.csv"), PROFILE_FIELDS)
+        fleet = aggregate([self.directory], workers=2)
+        self.assertEqual(fleet.hostsWithSsid("HomeNet"), ["pc-0"])
+        self.assertEqual(fleet.hostsWithSsid(PROFILES[2][0]), ["pc-0", "pc-1", "pc-2"])
+
+    def testNicsAreRegrouped(self):
+        nic = Nic("Wireless LAN adapter Wi-Fi")
+        nic.add("DHCP Enabled", "Yes")
+        nic.add("DNS Servers", "192.168.1.1")
+        nic.add("DNS Servers", "8.8.8.8")
+        path = os.path.join(self.directory, "pc-1.nics.jsonl.gz")
+        exportRecords(nicRecords([nic]), path, NIC_FIELDS)
+        path, hosts, error = loadSource(path)
+        self.assertIsNone(error)
+        self.assertEqual(hosts, [["pc-1", [], [[nic.name, nic.fields]]]])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+"""Ring buffers of AdapterStats and Monitor over a scripted source."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from monitor import AdapterStats, Monitor, StatsSource, RX_BYTES, TX_BYTES, WIDTH
+
+def counters(rx, tx=0):
+    return [rx, tx] + [0] * (WIDTH - 2)
+
+class AdapterStatsTest(unittest.TestCase):
+    def testWindowKeepsNewestIntervals(self):
+        stats = AdapterStats("eth0", capacity=4)
+        for tick in range(10):  # rx grows by tick * 100 per second
+            stats.add(float(tick), "up", counters(sum(i * 100 for i in range(tick + 1))))
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.history(RX_BYTES), [600.0, 700.0, 800.0, 900.0])
+        self.assertEqual(stats.average(RX_BYTES), 750.0)
+        self.assertEqual(stats.rates[RX_BYTES], 900.0)
+
+    def testResetCountsFromZero(self):
+        stats = AdapterStats("eth0", capacity=8)
+        stats.add(0.0, "up", counters(1000, 50))
+        stats.add(2.0, "up", counters(3000, 150))
+        stats.add(4.0, "up", counters(10, 10))    # adapter is re-enabled, counters restart
+        self.assertEqual(stats.history(RX_BYTES), [1000.0, 0.0])
+        self.assertEqual(stats.history(TX_BYTES), [50.0, 0.0])
+
+    def testSameTimeIsIgnored(self):
+        stats = AdapterStats("eth0")
+        stats.add(1.0, "up", counters(0))
+        stats.add(1.0, "up", counters(500))
+        self.assertEqual(stats.count, 0)
+        self.assertEqual(stats.average(RX_BYTES), 0.0)
+
+class ScriptedSource(StatsSource):
+    def __init__(self, samples):
+        self.samples = iter(samples)
+
+    def sample(self):
+        return next(self.samples)
+
+class MonitorTest(unittest.TestCase):
+    def testAdaptersAppearAndStay(self):
+        source = ScriptedSource([{"eth0": ("up", counters(0))},
+                                 {"eth0": ("up", counters(4000)), "wlan0": ("down", counters(0))}])
+        monitor = Monitor(source, capacity=10)
+        monitor.tick(0.0)
+        monitor.tick(2.0)
+        self.assertEqual(list(monitor.adapters), ["eth0", "wlan0"])
+        self.assertEqual(monitor.adapters["eth0"].rates[RX_BYTES], 2000.0)
+        self.assertEqual(monitor.adapters["wlan0"].state, "down")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Parsers of netsh and ipconfig outputs, on the captured fixtures and on synthetic outputs."""
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from parsers import parseProfiles, parseProfileInfo, parseIpConfig, iterKeyValues, Nic, ALL_USER, CURRENT_USER, HOST_SECTION
+from runner import ReplayRunner
+from collector import NetshWlan, IpConfig
+from synthetic import wlanListing, wlanProfile, ipconfigAll, ssidOf, keyOf, KINDS
+
+FIXTURES = os.path.join(ROOT, "fixtures", "sample")
+
+class NetshTest(unittest.TestCase):
+    def testFixtureProfiles(self):
+        network = NetshWlan(runner=ReplayRunner(FIXTURES))
+        self.assertEqual(network.listInfo, [["HomeNet", "WPA2-Personal", "correct horse battery"],
+                                            ["Office 5G", "WPA2-Personal", "0ff1ce;Pass:word"],
+                                            ["Cafe Free WiFi", "Open", "None"], ["Lab-WEP", "Open", "1234567890"]])
+        self.assertEqual(network.failures, [])
+
+    def testListingScopesAndInterfaces(self):
+        profiles = list(parseProfiles(wlanListing(20, interfaces=2).splitlines()))
+        self.assertEqual([profile.name for profile in profiles], [ssidOf(i) for i in range(0, 20, 2)] + [ssidOf(i) for i in range(1, 20, 2)])
+        self.assertEqual(profiles[0].interface, "Wi-Fi")
+        self.assertEqual(profiles[-1].interface, "Wi-Fi 2")
+        self.assertEqual(profiles[4].scope, ALL_USER)
+        self.assertEqual([profile.scope for profile in profiles if profile.name == ssidOf(9)], [CURRENT_USER])
+
+    def testProfileInfo(self):
+        for index in range(len(KINDS) * 2):
+            with self.subTest(index=index):
+                info = parseProfileInfo(wlanProfile(index, noise=3).splitlines())
+                self.assertEqual(info["Authentication"], KINDS[index % len(KINDS)])     # first of repeated labels
+                self.assertEqual(info.get("Key Content"), keyOf(index))
+                self.assertEqual(info["Extension 2"], "value")
+
+    def testKeyWithoutValue(self):
+        self.assertEqual(list(iterKeyValues(["Profile information", "---", "    Control options        :"])),
+                         [("Profile information", "Control options", "")])
+
+class IpConfigTest(unittest.TestCase):
+    def testFixture(self):
+        config = IpConfig(runner=ReplayRunner(FIXTURES))
+        self.assertEqual(config.host.get("Host Name"), "LAB-PC-01")
+        self.assertEqual(config.current, "Wireless LAN adapter Wi-Fi")
+        nic = config.nics[config.current]
+        self.assertEqual(nic.get("Default Gateway"), ["fe80::1%12", "192.168.1.1"])
+        self.assertEqual(nic.values("DNS Servers"), ["192.168.1.1", "8.8.8.8"])
+        self.assertEqual(IpConfig.fromData(config.toData()).nics[config.current].fields, nic.fields)
+
+    def testSynthetic(self):
+        nics = list(parseIpConfig(ipconfigAll(10).splitlines()))
+        self.assertEqual(nics[0].name, HOST_SECTION)
+        self.assertEqual(len(nics), 11)
+        self.assertEqual(nics[1].get("IPv4 Address"), ["10.0.0.2(Preferred)"])
+        self.assertEqual(nics[1].values("DNS Servers"), ["10.0.0.1", "8.8.8.8"])
+        self.assertEqual(nics[5].get("Media State"), "Media disconnected")
+
+    def testRowKeysAreUnique(self):
+        nic = Nic("Ethernet adapter Ethernet")     # router is DNS server too, continuation rows look the same
+        for label, value in (("Default Gateway", "fe80::1"), ("Default Gateway", "192.168.1.1"),
+                             ("DNS Servers", "fe80::1"), ("DNS Servers", "192.168.1.1"), ("DNS Servers", "192.168.1.1")):
+            nic.add(label, value)
+        rows = nic.rows()
+        self.assertEqual(rows[1], ["", "192.168.1.1"])
+        self.assertEqual(rows[3], ["", "192.168.1.1"])
+        self.assertEqual(rows[4], ["", "192.168.1.1"])
+        self.assertEqual(len(set(nic.rowKeys())), len(rows))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""Indexes of search.py against plain scans."""
+import os
+import sys
+import unittest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+from search import TextIndex, ProfileIndex, NicIndex
+from parsers import parseIpConfig, HOST_SECTION
+from synthetic import wlanRecords, ipconfigAll
+
+class TextIndexTest(unittest.TestCase):
+    def testSearchMatchesScan(self):
+        records = wlanRecords(500)
+        index = TextIndex()
+        for record in records:
+            index.add(record[0])
+        for query in ("", "n", "NE", "net", "network 4", "network 49", "guest; net, 1", "5", "zzz", "^guest", "^network 1", "^"):
+            with self.subTest(query=query):
+                text = query.casefold()
+                if text.startswith("^"):
+                    expected = [i for i, record in enumerate(records) if record[0].casefold().startswith(text[1:])]
+                else:
+                    expected = [i for i, record in enumerate(records) if text in record[0].casefold()]
+                self.assertEqual(list(index.search(query)), expected)
+                self.assertEqual([i for i in range(len(records)) if index.matches(i, query)], expected)
+
+class ProfileIndexTest(unittest.TestCase):
+    def testKindsAndCounts(self):
+        records = wlanRecords(100)
+        index = ProfileIndex(records[:60])
+        for record in records[60:]:     # incremental like loading
+            index.add(record)
+        self.assertEqual(index.search("network 1", "Open"),
+                         [i for i, record in enumerate(records) if "network 1" in record[0].lower() and record[1] == "Open"])
+        self.assertEqual(index.search("", "Shared"), [i for i, record in enumerate(records) if record[1] == "Shared"])
+        counts = {}
+        for record in records:
+            counts[record[1]] = counts.get(record[1], 0) + 1
+        self.assertEqual(index.counts, counts)
+        self.assertEqual(index.summary(), "Total: 100      " + "".join(kind + ": " + str(counts[kind]) + "      " for kind in sorted(counts)))
+        self.assertEqual(ProfileIndex().summary(), "Total: 0")
+
+class NicIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.nics = [nic for nic in parseIpConfig(ipconfigAll(6).splitlines()) if nic.name != HOST_SECTION]
+        self.index = NicIndex(self.nics)
+
+    def testProperty(self):
+        result = self.index.search("dhcp enabled = no")
+        self.assertEqual(sorted(result), sorted(nic.name for nic in self.nics if nic.get("DHCP Enabled") == "No"))
+        for name, rows in result.items():
+            nic = next(nic for nic in self.nics if nic.name == name)
+            self.assertEqual([nic.rows()[row] for row in rows], [["DHCP Enabled", "No"]])
+
+    def testContinuationRowsBelongToLabel(self):
+        result = self.index.search("DNS Servers=8.8.8.8")
+        self.assertTrue(result)
+        for name, rows in result.items():
+            nic = next(nic for nic in self.nics if nic.name == name)
+            self.assertEqual([nic.rows()[row] for row in rows], [["", "8.8.8.8"]])
+
+    def testNameMatchShowsAllRows(self):
+        result = self.index.search("wi-fi 3")
+        self.assertEqual(result, {"Wireless LAN adapter Wi-Fi 3": None})
+
+if __name__ == "__main__":
+    unittest.main()
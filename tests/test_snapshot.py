@@ -0,0 +1,148 @@
+"""SnapshotStore eviction, freshness, read-only databases of other hosts and diff of snapshots."""
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from snapshot import SnapshotStore, Snapshot, diff, WLAN, NICS
+from aggregate import loadSource
+
+def profiles(*records):
+    return {"profiles": [[record[0], "All User Profile", "Wi-Fi"] for record in records], "listInfo": [list(record) for record in records]}
+
+def nics(*entries):
+    return {"host": None, "nics": [[name, fields] for name, fields in entries]}
+
+class SnapshotStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="netinfo-test-")
+        self.path = os.path.join(self.directory, "snapshots.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def testLatestAndHistory(self):
+        store = SnapshotStore(self.path)
+        first = store.save(WLAN, profiles(["HomeNet", "WPA2-Personal", "secret"]), taken=100.0)
+        second = store.save(WLAN, profiles(["HomeNet", "WPA2-Personal", "changed"]), taken=200.0)
+        store.save(NICS, nics(["Ethernet adapter Ethernet", {"DHCP Enabled": "Yes"}]), taken=300.0)
+        latest = store.latest(WLAN)
+        self.assertEqual((latest.id, latest.kind, latest.taken), (second, WLAN, 200.0))
+        self.assertEqual(latest.data["listInfo"], [["HomeNet", "WPA2-Personal", "changed"]])
+        self.assertEqual(store.load(first).data["listInfo"], [["HomeNet", "WPA2-Personal", "secret"]])
+        self.assertEqual([id for id, taken, size in store.history(WLAN)], [second, first])
+        self.assertIsNone(store.load(12345))
+        self.assertIsNone(SnapshotStore(os.path.join(self.directory, "other.db")).latest(WLAN))
+
+    def testEvictionByCount(self):
+        store = SnapshotStore(self.path, maxSnapshots=3)
+        kept = store.save(NICS, nics(), taken=0.0)
+        ids = [store.save(WLAN, profiles(["Network " + str(i), "Open", "None"]), taken=float(i)) for i in range(1, 6)]
+        self.assertEqual([id for id, taken, size in store.history(WLAN)], ids[:1:-1])
+        self.assertIsNone(store.load(ids[0]))
+        self.assertEqual([id for id, taken, size in store.history(NICS)], [kept])    # other kinds are counted apart
+
+    def testEvictionByBytes(self):
+        store = SnapshotStore(self.path)
+        first = store.save(WLAN, profiles(["A", "WPA2-Personal", os.urandom(2000).hex()]), taken=1.0)     # hardly compressible
+        size = store.history(WLAN)[0][2]
+        store.maxBytes = size * 2 + size // 2
+        ids = [store.save(WLAN, profiles([str(i), "WPA2-Personal", os.urandom(2000).hex()]), taken=float(i)) for i in range(2, 6)]
+        history = store.history(WLAN)
+        self.assertEqual([id for id, taken, size in history], ids[:1:-1])
+        self.assertLessEqual(sum(size for id, taken, size in history), store.maxBytes)
+        self.assertIsNone(store.load(first))
+        store.maxBytes = 1  # the newest snapshot always stays
+        newest = store.save(WLAN, profiles(["B", "Open", "None"]), taken=10.0)
+        self.assertEqual([id for id, taken, size in store.history(WLAN)], [newest])
+
+    def testFresh(self):
+        store = SnapshotStore(self.path, ttl=60)
+        self.assertIsNone(store.fresh(WLAN))
+        store.save(WLAN, profiles(), taken=time.time() - 120)
+        self.assertIsNone(store.fresh(WLAN))
+        self.assertEqual(store.latest(WLAN).data, profiles())
+        store.ttl = 600
+        self.assertIsNotNone(store.fresh(WLAN))
+        id = store.save(WLAN, profiles(["HomeNet", "Open", "None"]))
+        store.ttl = 60
+        self.assertEqual(store.fresh(WLAN).id, id)
+
+    @unittest.skipUnless(os.name == "posix", "permissions of POSIX")
+    def testOwnerOnly(self):
+        directory = os.path.join(self.directory, "new", "store")
+        store = SnapshotStore(os.path.join(directory, "snapshots.db"))
+        store.save(WLAN, profiles(["HomeNet", "WPA2-Personal", "secret"]))
+        self.assertEqual(os.stat(directory).st_mode & 0o777, 0o700)
+        self.assertEqual(os.stat(store.path).st_mode & 0o777, 0o600)
+
+class ReadOnlyTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix="netinfo-test-")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def state(self):
+        """{name: sha256} of files in the directory"""
+        state = {}
+        for name in sorted(os.listdir(self.directory)):
+            with open(os.path.join(self.directory, name), "rb") as file:
+                state[name] = hashlib.sha256(file.read()).hexdigest()
+        return state
+
+    def testStoreIsUnchanged(self):
+        path = os.path.join(self.directory, "pc-3 (copy).db")
+        store = SnapshotStore(path)
+        store.save(WLAN, profiles(["HomeNet", "WPA2-Personal", "secret"]))
+        store.save(NICS, nics(["Ethernet adapter Ethernet", {"DHCP Enabled": "No"}]))
+        before = self.state()
+        reader = SnapshotStore(path, readOnly=True)
+        self.assertTrue(reader.isStore())
+        self.assertEqual(reader.latest(WLAN).data["listInfo"], [["HomeNet", "WPA2-Personal", "secret"]])
+        self.assertEqual(loadSource(path), (path, [["pc-3 (copy)", [["HomeNet", "WPA2-Personal", "secret"]],
+                                                    [["Ethernet adapter Ethernet", {"DHCP Enabled": "No"}]]]], None))
+        self.assertEqual(self.state(), before)
+
+    def testOtherFilesAreUnchanged(self):
+        database = os.path.join(self.directory, "other.db")
+        connection = sqlite3.connect(database)
+        connection.execute("CREATE TABLE thumbnails (name TEXT)")
+        connection.commit()
+        connection.close()
+        with open(os.path.join(self.directory, "Thumbs.db"), "wb") as file:
+            file.write(b"not a database" * 100)
+        before = self.state()
+        for name in ("other.db", "Thumbs.db", "missing.db"):
+            with self.subTest(name=name):
+                path = os.path.join(self.directory, name)
+                self.assertFalse(SnapshotStore(path, readOnly=True).isStore())
+                self.assertEqual(loadSource(path)[1], [])
+        self.assertEqual(self.state(), before)
+
+class DiffTest(unittest.TestCase):
+    def testProfiles(self):
+        old = Snapshot(1, WLAN, 0.0, profiles(["HomeNet", "WPA2-Personal", "a"], ["Cafe", "Open", "None"], ["Lab", "Open", "None"]))
+        new = Snapshot(2, WLAN, 1.0, profiles(["Lab", "Open", "None"], ["HomeNet", "WPA2-Personal", "b"], ["Office", "WPA2-Personal", "c"]))
+        self.assertEqual(diff(old, new), {"added": ["Office"], "removed": ["Cafe"],
+                                          "changed": [("HomeNet", ["HomeNet", "WPA2-Personal", "a"], ["HomeNet", "WPA2-Personal", "b"])]})
+        self.assertEqual(diff(new, new), {"added": [], "removed": [], "changed": []})
+
+    def testNics(self):
+        old = Snapshot(1, NICS, 0.0, nics(["Wi-Fi", {"DHCP Enabled": "Yes", "DNS Servers": ["192.168.1.1"]}], ["Bluetooth", {}]))
+        new = Snapshot(2, NICS, 1.0, nics(["Wi-Fi", {"DHCP Enabled": "No", "DNS Servers": ["192.168.1.1"], "IPv4 Address": "10.0.0.2"}],
+                                          ["Ethernet", {}]))
+        self.assertEqual(diff(old, new), {"added": ["Ethernet"], "removed": ["Bluetooth"],
+                                          "changed": [("Wi-Fi", [("DHCP Enabled", "Yes", "No"), ("IPv4 Address", None, "10.0.0.2")])]})
+
+    def testKindsDiffer(self):
+        with self.assertRaises(ValueError):
+            diff(Snapshot(1, WLAN, 0.0, profiles()), Snapshot(2, NICS, 0.0, nics()))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,230 @@
+"""Table in plain and virtual mode on a real treeview, skipped when Tk has no display."""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from tkinter import Tk, TclError
+from table import Table
+from parsers import Nic
+
+PROFILES = [["HomeNet", "WPA2-Personal", "correct horse"], ["Office 5G", "WPA2-Personal", "0ff1ce"],
+            ["Cafe Free WiFi", "Open", "None"], ["Lab-WEP", "Open", "1234567890"]]
+
+def setUpModule():
+    global root
+    try:
+        root = Tk()
+    except TclError as e:   # no display, e.g. a headless build machine
+        raise unittest.SkipTest("Tk is not available: " + str(e))
+    root.withdraw()
+
+def tearDownModule():
+    root.destroy()
+
+class TableCase(unittest.TestCase):
+    def table(self, virtual, header=("SSID", "Kind", "Key")):
+        """A table of header with an ID column, destroyed after the test"""
+        table = Table(root, height=5, virtual=virtual)
+        table.construct(list(header), [80] * len(header))
+        table.pack()
+        self.addCleanup(table.destroy)
+        return table
+
+    def rows(self, table):
+        """Values of shown rows from top to bottom, once pending renders are done"""
+        root.update_idletasks()
+        return [[str(value) for value in table.item(iid, "values")] for iid in table.get_children()]
+
+    def treeview(self, table):
+        """Treeview inside a table, which only holds materialized rows in virtual mode"""
+        return table._Table__table
+
+def numbered(records):
+    """Rows as a table shows them: ID column first"""
+    return [[str(i + 1)] + list(record) for i, record in enumerate(records)]
+
+class SyncTest(TableCase):
+    def testUnchangedRowsAreKept(self):
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                table = self.table(virtual)
+                table.sync(PROFILES)
+                before = table.get_children()
+                table.focus(before[0])
+                root.update_idletasks()
+                changed = [list(record) for record in PROFILES] + [["Guest", "Open", "None"]]
+                changed[2][2] = "changed"
+                table.sync(changed)
+                self.assertEqual(self.rows(table), numbered(changed))
+                self.assertEqual(table.get_children()[:4], before)
+                self.assertEqual(table.focus(), before[0])
+                self.assertEqual(self.treeview(table).selection(), (before[0],))
+
+    def testRepeatedKeysGetOwnRows(self):
+        records = [["HomeNet", "WPA2-Personal", "first"], ["HomeNet", "WPA2-Personal", "second"], ["Lab-WEP", "Open", "None"]]
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                table = self.table(virtual)
+                for attempt in range(2):    # the second sync matches rows which are there already
+                    table.sync(records)
+                    self.assertEqual(self.rows(table), numbered(records))
+                    self.assertEqual(len(set(table.get_children())), len(records))
+
+    def testDeletesAndReorders(self):
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                table = self.table(virtual)
+                table.sync(PROFILES)
+                iids = {record[0]: iid for record, iid in zip(PROFILES, table.get_children())}
+                records = [PROFILES[3], PROFILES[1], ["Guest", "Open", "None"]]
+                table.sync(records)
+                self.assertEqual(self.rows(table), numbered(records))
+                self.assertEqual(table.get_children()[:2], (iids["Lab-WEP"], iids["Office 5G"]))
+                table.sync([])
+                self.assertEqual(self.rows(table), [])
+
+    def testSyncAfterFillWithKeys(self):
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                nic = Nic("Ethernet adapter Ethernet")  # continuation rows of both labels look the same
+                for label, value in (("Default Gateway", "fe80::1"), ("Default Gateway", "192.168.1.1"),
+                                     ("DNS Servers", "fe80::1"), ("DNS Servers", "192.168.1.1")):
+                    nic.add(label, value)
+                table = self.table(virtual, header=("Property", "Value"))
+                table.fill(nic.rows(), keys=nic.rowKeys())
+                before = table.get_children()
+                table.sync(nic.rows(), keys=nic.rowKeys())
+                self.assertEqual(table.get_children(), before)
+                self.assertEqual(self.rows(table), numbered(nic.rows()))
+                nic.add("DNS Servers", "8.8.8.8")
+                table.sync(nic.rows(), keys=nic.rowKeys())
+                self.assertEqual(table.get_children()[:4], before)
+                self.assertEqual(self.rows(table), numbered(nic.rows()))
+
+class VirtualApiTest(TableCase):
+    """Virtual mode answers like the treeview of plain mode"""
+    def setUp(self):
+        self.plain = self.table(False)
+        self.virtual = self.table(True)
+        for table in (self.plain, self.virtual):
+            table.fill(PROFILES)
+
+    def pairs(self):
+        """(iid in plain table, iid in virtual table) of each row"""
+        return list(zip(self.plain.get_children(), self.virtual.get_children()))
+
+    def testItem(self):
+        for plain, virtual in self.pairs():
+            self.assertEqual(self.virtual.item(virtual), self.plain.item(plain))
+            self.assertEqual(self.virtual.item(virtual, "values"), self.plain.item(plain, "values"))
+        plain, virtual = self.pairs()[3]
+        self.assertEqual(self.virtual.item(virtual, "values"), ("4", "Lab-WEP", "Open", "1234567890"))
+        self.assertEqual(self.virtual.item(virtual)["values"], [4, "Lab-WEP", "Open", 1234567890])
+        self.assertEqual(self.virtual.item("", "values"), self.plain.item("", "values"))
+
+    def testSet(self):
+        for plain, virtual in self.pairs():
+            self.assertEqual(self.virtual.set(virtual), self.plain.set(plain))
+            self.assertEqual(self.virtual.set(virtual, "2"), self.plain.set(plain, "2"))
+        plain, virtual = self.pairs()[0]
+        self.assertEqual(self.virtual.set(virtual), {"1": "1", "2": "HomeNet", "3": "WPA2-Personal", "4": "correct horse"})
+        for table, iid in ((self.plain, plain), (self.virtual, virtual)):
+            table.set(iid, "3", "Open")
+        self.assertEqual(self.virtual.item(virtual, "values"), self.plain.item(plain, "values"))
+        root.update_idletasks()
+        self.assertEqual(self.treeview(self.virtual).set(virtual, "3"), "Open")
+
+    def testGetChildren(self):
+        self.assertEqual(len(self.virtual.get_children()), len(PROFILES))
+        for table in (self.plain, self.virtual):
+            table.view([1, 3])
+        self.assertEqual(self.rows(self.virtual), self.rows(self.plain))
+        self.assertEqual([row[1] for row in self.rows(self.virtual)], ["Office 5G", "Lab-WEP"])
+        for table in (self.plain, self.virtual):
+            table.view(None)
+        self.assertEqual(self.rows(self.virtual), numbered(PROFILES))
+
+    def testFocusAndSee(self):
+        records = [["Network " + str(i), "Open", "None"] for i in range(200)]
+        for table in (self.plain, self.virtual):
+            table.clear()
+            table.fill(records)
+        self.assertEqual(self.plain.focus(), "")
+        self.assertEqual(self.virtual.focus(), "")
+        for plain, virtual in (self.pairs()[150], self.pairs()[3]):
+            self.plain.focus(plain)
+            self.virtual.focus(virtual)
+            root.update_idletasks()
+            self.assertEqual(self.plain.focus(), plain)
+            self.assertEqual(self.virtual.focus(), virtual)
+            self.assertIn(virtual, self.treeview(self.virtual).get_children())     # materialized around it
+            self.assertEqual(self.treeview(self.virtual).selection(), (virtual,))
+        self.virtual.see(self.virtual.get_children()[199])
+        root.update_idletasks()
+        materialized = self.treeview(self.virtual).get_children()
+        self.assertIn(self.virtual.get_children()[199], materialized)
+        self.assertNotIn(self.virtual.get_children()[3], materialized)
+        self.assertEqual(self.virtual.focus(), self.virtual.get_children()[3])   # focus outlives its treeview item
+
+class MaskTest(TableCase):
+    def keys(self, table):
+        """Key column of rows, as table tells and as its treeview shows it"""
+        root.update_idletasks()
+        shown = [self.treeview(table).item(iid, "values")[3] for iid in self.treeview(table).get_children()]
+        self.assertEqual(shown, [table.item(iid, "values")[3] for iid in table.get_children()][:len(shown)])
+        return [table.item(iid, "values")[3] for iid in table.get_children()]
+
+    def testToggleTwice(self):
+        clear = [record[2] for record in PROFILES]
+        masked = ["*" * len(key) for key in clear]
+        for virtual in (False, True):
+            for before in (True, False):    # mask before rows arrive, like the Wi-Fi tab, or after
+                with self.subTest(virtual=virtual, before=before):
+                    table = self.table(virtual)
+                    if before:
+                        table.mask("4")
+                        table.showMasked(True)
+                        table.fill(PROFILES)
+                    else:
+                        table.fill(PROFILES)
+                        table.mask("4")
+                        table.showMasked(True)
+                    self.assertEqual(self.keys(table), masked)
+                    for attempt in range(2):
+                        table.showMasked(False)
+                        self.assertEqual(self.keys(table), clear)
+                        table.showMasked(True)
+                        self.assertEqual(self.keys(table), masked)
+                    table.append(["Guest", "Open", "guest"])
+                    self.assertEqual(self.keys(table)[-1], "*****")
+                    table.showMasked(False)
+                    self.assertEqual(self.keys(table)[-1], "guest")
+
+    def testSetMaskedCell(self):
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                table = self.table(virtual)
+                table.fill(PROFILES)
+                table.mask("4")
+                table.showMasked(True)
+                iid = table.get_children()[1]
+                table.set(iid, "4", "new key")
+                self.assertEqual(table.item(iid, "values")[3], "*******")
+                table.showMasked(False)
+                self.assertEqual(table.item(iid, "values")[3], "new key")
+
+    def testSetColumn(self):
+        kinds = ["WPA3-Personal", "Open", "WPA2-Enterprise", "Shared"]
+        for virtual in (False, True):
+            with self.subTest(virtual=virtual):
+                table = self.table(virtual)
+                table.fill(PROFILES)
+                table.setColumn("3", kinds)     # one Tcl call of ::tableSetColumn in plain mode
+                root.update_idletasks()
+                self.assertEqual([table.item(iid, "values")[2] for iid in table.get_children()], kinds)
+                self.assertEqual([self.treeview(table).set(iid, "3") for iid in self.treeview(table).get_children()], kinds)
+                self.assertEqual(self.rows(table), numbered([[ssid, kind, key] for (ssid, old, key), kind in zip(PROFILES, kinds)]))
+
+if __name__ == "__main__":
+    unittest.main()